@@ -1,4 +1,5 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import DeclarativeBase
 import os
 from dotenv import load_dotenv
@@ -28,6 +29,18 @@ async def get_db():
     async with SessionLocal() as session:
         yield session
 
+# Columns added after the first release; create_all does not alter existing tables
+ADDED_COLUMNS = {"decision_logs": {"episode": "JSON"}}
+
+def _add_missing_columns(conn):
+    inspector = inspect(conn)
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for name, ddl_type in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
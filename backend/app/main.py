@@ -1,21 +1,44 @@
+import time
+_import_started = time.perf_counter()
+
+import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .database import init_db
-from .routers import mission, websocket, ai
+from .routers import mission, websocket, ai, fleet
+from .services.autonomy_service import engine as autonomy_engine
+from .services.llm_service import close_model_analyzer
+from .responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    startup_started = time.perf_counter()
     await init_db()
+    autonomy_engine.start_background_tasks()
+    app.state.startup_timings = {
+        "pid": os.getpid(),
+        "import_ms": round(IMPORT_SECONDS * 1000, 1),
+        "startup_ms": round((time.perf_counter() - startup_started) * 1000, 1),
+    }
+    logger.info(
+        f"Worker {os.getpid()} ready: import {app.state.startup_timings['import_ms']} ms, "
+        f"startup {app.state.startup_timings['startup_ms']} ms"
+    )
     yield
     # Shutdown
+    await autonomy_engine.shutdown()
+    await close_model_analyzer()
 
 app = FastAPI(
     title="ORBITA Mission Control API",
     description="Backend for Autonomous Space Mission Planner",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -36,7 +59,21 @@ app.add_middleware(
 app.include_router(mission.router, prefix="/mission", tags=["Mission"])
 app.include_router(websocket.router, tags=["WebSocket"])
 app.include_router(ai.router, prefix="/ai", tags=["AI"])
+app.include_router(fleet.router, prefix="/fleet", tags=["Fleet"])
 
 @app.get("/")
 async def root():
     return {"message": "ORBITA Mission Control System Online"}
+
+@app.get("/health", response_class=ORJSONResponse)
+async def health():
+    """
+    Liveness plus this worker's measured import and startup cost.
+    """
+    return {
+        "status": "ok",
+        "active_missions": len(autonomy_engine.active_tasks),
+        **getattr(app.state, "startup_timings", {}),
+    }
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
@@ -54,6 +54,7 @@ class DecisionLog(Base):
     # New fields for advanced reasoning
     root_cause = Column(Text, nullable=True)
     recovery_options = Column(JSON, nullable=True) # List of actions considered
+    episode = Column(JSON, nullable=True) # Anomaly episode summary (duration, peaks, confidence range)
     
     outcome_verified = Column(Boolean, nullable=True)
     
@@ -0,0 +1,30 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed.
+    Only for routes that return plain dicts or build their response by hand: with a
+    response_model, FastAPI's default class serializes the model straight to JSON
+    bytes, which is faster than dumping it to a dict and re-encoding with orjson.
+    """
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps(data: Any) -> str:
+    """
+    Serializes a WebSocket payload to text, using orjson when available.
+    """
+    if orjson is None:
+        return json.dumps(data, default=str)
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
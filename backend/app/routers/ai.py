@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends
 from .. import schemas
+from ..responses import ORJSONResponse
 from ..services.ai_service import AIService
+from ..services.llm_service import get_model_analyzer
 
 router = APIRouter()
 
@@ -13,3 +15,13 @@ async def analyze_telemetry(telemetry: schemas.TelemetryCreate):
     ai_service = AIService()
     response = await ai_service.analyze_telemetry(telemetry)
     return response
+
+@router.get("/model/status", response_class=ORJSONResponse)
+async def model_status():
+    """
+    Batching, cache and budget counters for the model-backed analyzer.
+    """
+    analyzer = get_model_analyzer()
+    if analyzer is None:
+        return {"enabled": False}
+    return {"enabled": True, "model": analyzer.model, **analyzer.status()}
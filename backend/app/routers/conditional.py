@@ -0,0 +1,31 @@
+from fastapi import Request, Response
+from ..responses import ORJSONResponse
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True if the request's If-None-Match header already covers `etag`.
+    Weak validators (W/"...") compare equal to their strong form.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_response(request: Request, etag: str, build_content) -> Response:
+    """
+    Returns 304 when the client copy is current, otherwise builds the body lazily.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content=build_content(), headers=headers)
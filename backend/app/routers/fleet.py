@@ -0,0 +1,58 @@
+import zlib
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from .. import schemas
+from ..responses import ORJSONResponse
+from ..services.autonomy_service import engine as autonomy_engine, SNAPSHOT_FIELDS
+from .conditional import conditional_response
+
+router = APIRouter()
+
+@router.get("/snapshot", response_model=schemas.FleetSnapshot)
+async def get_fleet_snapshot(
+    request: Request,
+    fields: Optional[str] = None,
+    satellite_type: Optional[str] = None,
+):
+    """
+    Latest state of every running mission, served from the autonomy engine's memory.
+    `fields` is a comma-separated projection, e.g. `battery_level,thermal_state`.
+    """
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(selected) - SNAPSHOT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown snapshot fields: {', '.join(sorted(unknown))}")
+
+    # Different projections are different representations, so they get different ETags
+    variant = zlib.crc32(f"{','.join(sorted(selected or []))}|{satellite_type or ''}".encode())
+    etag = f'"{autonomy_engine.instance_id}-fleet-{autonomy_engine.fleet_version}-{variant:08x}"'
+    return conditional_response(
+        request,
+        etag,
+        lambda: autonomy_engine.fleet_snapshot(fields=selected, satellite_type=satellite_type),
+    )
+
+@router.get("/summary", response_model=schemas.FleetSummary)
+async def get_fleet_summary():
+    """
+    Live fleet aggregates maintained incrementally by the autonomy engine.
+    """
+    return autonomy_engine.fleet_health.summary()
+
+@router.get("/conjunctions", response_class=ORJSONResponse)
+async def get_conjunctions():
+    """
+    Result of the latest constellation conjunction screening pass.
+    """
+    if autonomy_engine.conjunction_report is None:
+        return {"screened_at": None, "approaches": []}
+    return autonomy_engine.conjunction_report
+
+@router.get("/cadence", response_class=ORJSONResponse)
+async def get_cadence(missions: bool = False):
+    """
+    Adaptive sampling state: budget vs demand, shedding counters and (optionally) per-mission rates.
+    """
+    return autonomy_engine.cadence.status(include_missions=missions)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from .. import schemas
 from ..services.mission_service import MissionService
 from ..services.autonomy_service import engine as autonomy_engine
+from .conditional import conditional_response
 
 router = APIRouter()
 
@@ -21,11 +22,61 @@ async def create_mission(
     background_tasks.add_task(
         autonomy_engine.start_mission_loop, 
         db_mission.id, 
-        db_mission.satellite_type
+        db_mission.satellite_type,
+        altitude=db_mission.altitude,
+        inclination=db_mission.inclination,
     )
     
     return db_mission
 
+# Bulk routes are registered before the /{mission_id} routes so "bulk" is never parsed as an id
+@router.post("/bulk", response_model=schemas.MissionBulkResult)
+async def create_missions_bulk(request: schemas.MissionBulkCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Creates many missions in one transaction and (by default) registers them all
+    with the autonomy engine, with start phases staggered across the tick interval.
+    """
+    service = MissionService(db)
+    rows = await service.create_missions_bulk(request.missions)
+    started = 0
+    if request.auto_start:
+        started = await autonomy_engine.start_missions_bulk(
+            (row.id, row.satellite_type, row.altitude, row.inclination) for row in rows
+        )
+    return {"mission_ids": [row.id for row in rows], "started": started}
+
+@router.post("/bulk/start", response_model=schemas.MissionBulkResult)
+async def start_missions_bulk(request: schemas.MissionBulkIds, db: AsyncSession = Depends(get_db)):
+    """
+    Starts autonomy loops for existing missions, staggered across the tick interval.
+    Ids with no mission row are reported in `missing`; already running loops are left alone.
+    """
+    service = MissionService(db)
+    missions = await service.get_missions(request.mission_ids)
+    found = {mission.id for mission in missions}
+    started = await autonomy_engine.start_missions_bulk(
+        (mission.id, mission.satellite_type, mission.altitude, mission.inclination) for mission in missions
+    )
+    return {
+        "mission_ids": [mission.id for mission in missions],
+        "started": started,
+        "missing": [mission_id for mission_id in request.mission_ids if mission_id not in found],
+    }
+
+@router.post("/bulk/stop", response_model=schemas.MissionBulkResult)
+async def stop_missions_bulk(request: schemas.MissionBulkIds):
+    """
+    Stops the listed autonomy loops. `mission_ids` holds the loops actually stopped;
+    ids with no running loop are reported in `missing`.
+    """
+    stopped = await autonomy_engine.stop_missions_bulk(request.mission_ids)
+    stopped_ids = set(stopped)
+    return {
+        "mission_ids": stopped,
+        "stopped": len(stopped),
+        "missing": [mission_id for mission_id in request.mission_ids if mission_id not in stopped_ids],
+    }
+
 @router.get("/{mission_id}", response_model=schemas.Mission)
 async def get_mission(mission_id: int, db: AsyncSession = Depends(get_db)):
     service = MissionService(db)
@@ -34,6 +85,20 @@ async def get_mission(mission_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Mission not found")
     return mission
 
+@router.get("/{mission_id}/telemetry/latest", response_model=schemas.LatestTelemetry)
+async def get_latest_telemetry(mission_id: int, request: Request):
+    """
+    Latest telemetry straight from the autonomy engine (no DB access).
+    Supports If-None-Match against the per-mission tick ETag.
+    """
+    if mission_id not in autonomy_engine.mission_states:
+        raise HTTPException(status_code=404, detail="Mission loop not running")
+    return conditional_response(
+        request,
+        autonomy_engine.mission_etag(mission_id),
+        lambda: autonomy_engine.get_latest_state(mission_id),
+    )
+
 @router.post("/{mission_id}/start")
 async def start_mission(mission_id: int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     service = MissionService(db)
@@ -41,7 +106,13 @@ async def start_mission(mission_id: int, background_tasks: BackgroundTasks, db:
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
     
-    background_tasks.add_task(autonomy_engine.start_mission_loop, mission.id, mission.satellite_type)
+    background_tasks.add_task(
+        autonomy_engine.start_mission_loop,
+        mission.id,
+        mission.satellite_type,
+        altitude=mission.altitude,
+        inclination=mission.inclination,
+    )
     return {"message": "Mission started"}
 
 @router.post("/{mission_id}/stop")
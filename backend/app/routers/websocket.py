@@ -1,45 +1,319 @@
+import asyncio
+import logging
+import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, List
-import json
+from pydantic import ValidationError
+from typing import Dict, List, Optional, Set
+from .. import schemas
+from ..responses import dumps
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Top-level sections of a mission update that fields can be selected from
+PAYLOAD_SECTIONS = {"telemetry", "decision", "episodes", "source"}
+# Outgoing messages buffered per connection before a slow client starts losing updates
+OUTBOX_SIZE = 256
+
+
+def validate_fields(fields: List[str]) -> Optional[str]:
+    for field in fields:
+        section, _, name = field.partition(".")
+        if section not in PAYLOAD_SECTIONS:
+            return f"Unknown field '{field}'; use one of {sorted(PAYLOAD_SECTIONS)} or '<section>.<name>'"
+        if section == "telemetry" and name and name not in schemas.TelemetryBase.model_fields:
+            return f"Unknown telemetry field '{name}'"
+        if section == "episodes" and name:
+            return "Select 'episodes' as a whole; it is a list of episode transitions"
+    return None
+
+
+def project_payload(data: dict, fields: Optional[List[str]]) -> dict:
+    """
+    Keeps only the requested sections / dotted fields, e.g. ["telemetry.battery_level", "decision.anomaly_detected"].
+    """
+    if not fields:
+        return data
+    projected = {}
+    for field in fields:
+        section, _, name = field.partition(".")
+        value = data.get(section)
+        if not name:
+            projected[section] = value
+        elif value is None:
+            # Section absent this tick (e.g. no decision): keep the shape, report None
+            projected.setdefault(section, None)
+        else:
+            target = projected.get(section)
+            if target is None:
+                target = projected[section] = {}
+            target[name] = value.get(name)
+    return projected
+
+
+class Subscription:
+    """
+    A set of missions / satellite types on one connection, with its own field
+    projection and rate cap. Between flushes only the latest update per mission
+    is kept (coalesce-to-latest). A tick without a decision never erases a pending
+    one, but a newer decision replaces an older one; episode transitions (which
+    record every opening, heartbeat and closure) accumulate in order until delivered.
+    """
+    def __init__(self, connection: "ClientConnection", sub_id: str, raw: bool = False):
+        self.connection = connection
+        self.id = sub_id
+        self.raw = raw  # legacy per-mission socket: send the bare payload, one message per update
+        self.missions: Set[int] = set()
+        self.satellite_types: Set[str] = set()
+        self.fields: Optional[List[str]] = None
+        self.max_rate: Optional[float] = None
+        self.pending: Dict[int, dict] = {}
+        self.last_flush = 0.0
+        self._flush_handle = None
+
+    def offer(self, mission_id: int, data: dict):
+        previous = self.pending.get(mission_id)
+        if previous is not None:
+            if data.get("decision") is None and previous.get("decision") is not None:
+                data = {**data, "decision": previous["decision"]}
+            if previous.get("episodes"):
+                data = {**data, "episodes": previous["episodes"] + (data.get("episodes") or [])}
+        self.pending[mission_id] = data
+
+        if self._flush_handle is not None:
+            return
+        delay = 0.0
+        if self.max_rate:
+            delay = self.last_flush + 1.0 / self.max_rate - time.monotonic()
+        if delay <= 0:
+            self.flush()
+        else:
+            self._flush_handle = asyncio.get_running_loop().call_later(delay, self.flush)
+
+    def flush(self):
+        self._flush_handle = None
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        self.last_flush = time.monotonic()
+        if self.raw:
+            for data in pending.values():
+                self.connection.enqueue(data)
+            return
+        self.connection.enqueue({
+            "type": "update",
+            "subscription": self.id,
+            "updates": [
+                {"mission_id": mission_id, **project_payload(data, self.fields)}
+                for mission_id, data in pending.items()
+            ],
+        })
+
+    def cancel(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.pending.clear()
+
+
+class ClientConnection:
+    """
+    One WebSocket plus its subscriptions. Fan-out only enqueues; a per-connection
+    writer task does the actual sends so a slow client never blocks the mission loops.
+    Messages that don't fit in the outbox are dropped and counted; once the writer
+    catches up, `/live` clients get an overflow notice with the count.
+    """
+    def __init__(self, websocket: WebSocket, notify_drops: bool = True):
+        self.websocket = websocket
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self.dropped = 0
+        self.notify_drops = notify_drops  # legacy sockets only understand mission payloads
+        self._reported_drops = 0
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message):
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _write_loop(self):
+        try:
+            while True:
+                message = await self.outbox.get()
+                if self.dropped > self._reported_drops:
+                    await self._report_drops()
+                await self.websocket.send_text(message if isinstance(message, str) else dumps(message))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket writer stopped: {e}")
+
+    async def _report_drops(self):
+        newly_dropped = self.dropped - self._reported_drops
+        self._reported_drops = self.dropped
+        if self.notify_drops:
+            await self.websocket.send_text(dumps({"type": "overflow", "dropped": newly_dropped, "total_dropped": self.dropped}))
+        else:
+            logger.warning(f"Slow WebSocket client: dropped {newly_dropped} messages ({self.dropped} total)")
+
+    async def close(self):
+        for subscription in self.subscriptions.values():
+            subscription.cancel()
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+
+
 class ConnectionManager:
     def __init__(self):
-        # mission_id -> List[WebSocket]
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Subscription indexes, so fan-out only touches interested subscribers
+        self.by_mission: Dict[int, Set[Subscription]] = {}
+        self.by_type: Dict[str, Set[Subscription]] = {}
+        self.connections: Set[ClientConnection] = set()
 
-    async def connect(self, websocket: WebSocket, mission_id: str):
+    async def connect(self, websocket: WebSocket, notify_drops: bool = True) -> ClientConnection:
         await websocket.accept()
-        if mission_id not in self.active_connections:
-            self.active_connections[mission_id] = []
-        self.active_connections[mission_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, mission_id: str):
-        if mission_id in self.active_connections:
-            if websocket in self.active_connections[mission_id]:
-                self.active_connections[mission_id].remove(websocket)
-            if not self.active_connections[mission_id]:
-                del self.active_connections[mission_id]
-
-    async def broadcast_mission_update(self, mission_id: int, data: dict):
-        str_id = str(mission_id)
-        if str_id in self.active_connections:
-            for connection in self.active_connections[str_id]:
-                try:
-                    await connection.send_json(data)
-                except Exception as e:
-                    print(f"Error broadcasting to {str_id}: {e}")
+        connection = ClientConnection(websocket, notify_drops=notify_drops)
+        connection.start()
+        self.connections.add(connection)
+        return connection
+
+    async def disconnect(self, connection: ClientConnection):
+        for subscription in list(connection.subscriptions.values()):
+            self._unindex(subscription)
+        await connection.close()
+        self.connections.discard(connection)
+
+    def subscribe(self, connection: ClientConnection, request: schemas.SubscriptionRequest, raw: bool = False) -> Subscription:
+        subscription = connection.subscriptions.get(request.id)
+        if subscription is None:
+            subscription = connection.subscriptions[request.id] = Subscription(connection, request.id, raw=raw)
+        self.update(subscription, request)
+        return subscription
+
+    def update(self, subscription: Subscription, request: schemas.SubscriptionRequest):
+        self._unindex(subscription)
+        if request.missions is not None:
+            subscription.missions = set(request.missions)
+        if request.satellite_types is not None:
+            subscription.satellite_types = set(request.satellite_types)
+        if request.fields is not None:
+            subscription.fields = request.fields or None
+        if "max_rate" in request.model_fields_set:
+            subscription.max_rate = request.max_rate
+        self._index(subscription)
+
+    def unsubscribe(self, connection: ClientConnection, sub_id: str) -> bool:
+        subscription = connection.subscriptions.pop(sub_id, None)
+        if subscription is None:
+            return False
+        self._unindex(subscription)
+        subscription.cancel()
+        return True
+
+    def _index(self, subscription: Subscription):
+        for mission_id in subscription.missions:
+            self.by_mission.setdefault(mission_id, set()).add(subscription)
+        for sat_type in subscription.satellite_types:
+            self.by_type.setdefault(sat_type, set()).add(subscription)
+
+    def _unindex(self, subscription: Subscription):
+        for index, keys in ((self.by_mission, subscription.missions), (self.by_type, subscription.satellite_types)):
+            for key in keys:
+                subscribers = index.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del index[key]
+
+    async def broadcast_mission_update(self, mission_id: int, data: dict, satellite_type: Optional[str] = None):
+        subscribers = self.by_mission.get(mission_id)
+        if satellite_type is not None and satellite_type in self.by_type:
+            subscribers = (subscribers or set()) | self.by_type[satellite_type]
+        if not subscribers:
+            return
+
+        raw_message = None
+        for subscription in subscribers:
+            if subscription.raw and subscription.max_rate is None:
+                # Legacy sockets get the same bytes: serialize once per update
+                if raw_message is None:
+                    raw_message = dumps(data)
+                subscription.connection.enqueue(raw_message)
+            else:
+                subscription.offer(mission_id, data)
 
 manager = ConnectionManager()
 
+@router.websocket("/live")
+async def live_endpoint(websocket: WebSocket):
+    """
+    Multiplexed feed. Send JSON messages to manage subscriptions on this one connection:
+      {"op": "subscribe", "id": "wall", "satellite_types": ["LEO"], "missions": [1, 2],
+       "fields": ["telemetry.battery_level", "decision.anomaly_detected"], "max_rate": 1}
+      {"op": "update", "id": "wall", "max_rate": 0.2}
+      {"op": "unsubscribe", "id": "wall"}
+    Updates arrive as {"type": "update", "subscription": id, "updates": [{"mission_id": ..., ...}]}.
+    If the client reads too slowly and updates are dropped, {"type": "overflow", "dropped": n,
+    "total_dropped": total} precedes the next message; {"op": "ping"} replies with the running count.
+    """
+    connection = await manager.connect(websocket)
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                request = schemas.SubscriptionRequest.model_validate_json(text)
+            except ValidationError as e:
+                connection.enqueue({"type": "error", "message": e.errors(include_url=False)})
+                continue
+
+            if request.op == "ping":
+                connection.enqueue({"type": "pong", "dropped": connection.dropped})
+                continue
+            if not request.id:
+                connection.enqueue({"type": "error", "op": request.op, "message": "Subscription 'id' is required"})
+                continue
+            if request.fields:
+                error = validate_fields(request.fields)
+                if error:
+                    connection.enqueue({"type": "error", "op": request.op, "id": request.id, "message": error})
+                    continue
+
+            if request.op == "subscribe":
+                manager.subscribe(connection, request)
+            elif request.op == "update":
+                subscription = connection.subscriptions.get(request.id)
+                if subscription is None:
+                    connection.enqueue({"type": "error", "op": request.op, "id": request.id, "message": "Unknown subscription"})
+                    continue
+                manager.update(subscription, request)
+            elif request.op == "unsubscribe":
+                if not manager.unsubscribe(connection, request.id):
+                    connection.enqueue({"type": "error", "op": request.op, "id": request.id, "message": "Unknown subscription"})
+                    continue
+            connection.enqueue({"type": "ack", "op": request.op, "id": request.id})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await manager.disconnect(connection)
+
 @router.websocket("/mission/live/{mission_id}")
-async def websocket_endpoint(websocket: WebSocket, mission_id: str):
-    await manager.connect(websocket, mission_id)
+async def websocket_endpoint(websocket: WebSocket, mission_id: int):
+    # Single-mission feed: every tick, full payload (an implicit raw subscription)
+    connection = await manager.connect(websocket, notify_drops=False)
+    manager.subscribe(connection, schemas.SubscriptionRequest(op="subscribe", id="mission", missions=[mission_id]), raw=True)
     try:
         while True:
             # Keep connection alive, maybe receive commands from frontend later
             data = await websocket.receive_text()
             # Echo for pong or ignoring
     except WebSocketDisconnect:
-        manager.disconnect(websocket, mission_id)
+        pass
+    finally:
+        await manager.disconnect(connection)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 class TelemetryBase(BaseModel):
     battery_level: float
@@ -86,6 +86,7 @@ class DecisionBase(BaseModel):
     # Expanded fields for storage
     root_cause: Optional[str] = None
     recovery_options: Optional[List[Dict[str, Any]]] = None
+    episode: Optional[Dict[str, Any]] = None
 
 class DecisionCreate(DecisionBase):
     pass
@@ -117,6 +118,54 @@ class Mission(MissionBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class MissionBulkCreate(BaseModel):
+    missions: List[MissionCreate]
+    auto_start: bool = True
+
+class MissionBulkIds(BaseModel):
+    mission_ids: List[int]
+
+class MissionBulkResult(BaseModel):
+    mission_ids: List[int]
+    started: int = 0
+    stopped: int = 0
+    missing: List[int] = []
+
 class MissionUpdate(BaseModel):
     status: Optional[str] = None
     is_active: Optional[bool] = None
+
+
+class LatestTelemetry(BaseModel):
+    mission_id: int
+    satellite_type: Optional[str] = None
+    tick: int
+    updated_at: datetime
+    interval_s: Optional[float] = None
+    telemetry: TelemetryCreate
+
+class FleetSnapshot(BaseModel):
+    version: int
+    count: int
+    missions: List[Dict[str, Any]]
+
+class FleetSummary(BaseModel):
+    active_missions: int
+    missions_by_status: Dict[str, int]
+    missions_by_type: Dict[str, int]
+    autonomy_modes: Dict[str, int]
+    anomalies: Dict[str, Dict[str, int]]
+    confidence: Dict[str, Optional[float]]
+    ticks_processed: int
+    pending_status_writes: int
+
+class SubscriptionRequest(BaseModel):
+    """
+    Client -> server message on the multiplexed /live WebSocket.
+    """
+    op: Literal["subscribe", "update", "unsubscribe", "ping"]
+    id: Optional[str] = None
+    missions: Optional[List[int]] = None
+    satellite_types: Optional[List[str]] = None
+    fields: Optional[List[str]] = None
+    max_rate: Optional[float] = Field(default=None, gt=0)  # updates per second; None = every tick
@@ -1,19 +1,58 @@
 import random
 import os
 import json
+from typing import Optional
 from .. import schemas
 from ..prompts import SYSTEM_PROMPT
+from .detector_service import DetectorSignals, wrap_angle
+from .llm_service import get_model_analyzer
+
+# Pre-emptive actions for trend / deviation flags, keyed by the metric behind them
+EARLY_WARNING_ACTIONS = {
+    "battery_level": ["PRE-EMPT: Defer high-draw payload activity until charge trend recovers", "Re-optimize solar array angle"],
+    "thermal_state": ["PRE-EMPT: Bias Redundant Radiator Loop B ahead of thermal limit", "Reduce core processor duty cycle"],
+    "orientation_roll": ["SCHEDULE: Reaction Wheel Desaturation at next ground pass", "Tighten attitude control deadband"],
+    "signal_latency": ["MONITOR: Switch TT&C to backup ground station if latency keeps rising"],
+}
 
 class AIService:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
+        self.model_analyzer = get_model_analyzer()
 
-    async def analyze_telemetry(self, telemetry: schemas.TelemetryCreate) -> schemas.AIResponse:
+    async def analyze_telemetry(
+        self,
+        telemetry: schemas.TelemetryCreate,
+        signals: Optional[DetectorSignals] = None,
+    ) -> schemas.AIResponse:
         """
         Analyzes telemetry data acting as ORBITA-Ω (Omega).
         Adheres to the strict planetary-scale intelligence output contract.
+        `signals` are the mission's streaming detector outputs, when available.
+
+        When a model endpoint is configured it is consulted first, under a hard deadline;
+        the rule cascade answers whenever the model is late, unavailable or over budget.
+        """
+        rule_response = self.rule_analysis(telemetry, signals)
+        if self.model_analyzer is None:
+            return rule_response
+
+        model_response = await self.model_analyzer.analyze(telemetry)
+        if model_response is None:
+            return rule_response
+        # Never let the model talk a hard-threshold breach down to nominal
+        if rule_response.anomaly_detected and not model_response.anomaly_detected:
+            return rule_response
+        return model_response
+
+    def rule_analysis(
+        self,
+        telemetry: schemas.TelemetryCreate,
+        signals: Optional[DetectorSignals] = None,
+    ) -> schemas.AIResponse:
+        """
+        Deterministic rule cascade (hard thresholds, then detector early warnings).
         """
-        
         # Nominal Base State
         global_state = "Orbital shells nominal. No large-scale debris cascades detected in current sector."
         patterns = []
@@ -23,6 +62,11 @@ class AIService:
         counterfactual = "Without intervention, the system would remain in a passive monitoring state with no loss of mission life."
         confidence = 1.0
         explanation = "Telemetry cross-correlated with planetary state. Variance within 1-sigma of behavioral fingerprint."
+        if signals is not None:
+            explanation = (
+                "Telemetry cross-correlated with planetary state. "
+                f"Largest deviation {signals.max_abs_z:.1f}-sigma from EWMA behavioral fingerprint."
+            )
 
         # --- ORBITA-Ω INTELLIGENCE LOGIC (Simulation) ---
 
@@ -52,7 +96,7 @@ class AIService:
             confidence = 0.94
             explanation = "Digital Twin detects radiator flow restriction. Thermal gradients deviating from expected physics model."
             
-        elif not telemetry.is_stable or abs(telemetry.orientation_roll) > 10:
+        elif not telemetry.is_stable or abs(wrap_angle(telemetry.orientation_roll)) > 10:
             global_state = "ATTITUDE DIVERGENCE - Planetary state correlation error."
             patterns = ["Momentum saturation signature in Z-axis", "Attitude drift exceeding 1.2 deg/sec"]
             predicted_events = [
@@ -65,6 +109,32 @@ class AIService:
             confidence = 0.91
             explanation = "Attitude control laws approaching singularity. Behavioral fingerprinting identifies external disturbance torque accumulation."
 
+        elif signals is not None and signals.flags:
+            # No hard limit breached yet, but the streaming detectors see a deviation or a trend heading for one
+            metric = signals.primary_metric
+            eta = signals.projections.get(metric)
+            global_state = "EARLY WARNING - Statistical drift detected ahead of hard safety limits."
+            # Stable first pattern so repeated warnings coalesce into one episode
+            patterns = [f"Early warning: {metric} drift"] + signals.flags
+            predicted_events = []
+            if eta is not None:
+                predicted_events.append(
+                    schemas.PredictedEvent(event=f"{metric} limit breach at current trend", probability=0.7, time_horizon=f"T+{eta:.0f} s")
+                )
+            risk = "ELEVATED: Trend-based precursor to a threshold violation."
+            recommendations = EARLY_WARNING_ACTIONS.get(metric, ["Continue standard orbital maintenance."])
+            counterfactual = "Waiting for the hard threshold would leave less margin for corrective action once it is crossed."
+            confidence = 0.7
+            stats = signals.metrics[metric]
+            explanation = (
+                f"{metric} at {stats['value']:.2f} vs EWMA baseline {stats['mean']:.2f} ± {stats['std']:.2f} "
+                f"(z={stats['z']:+.1f}, rate {stats['rate']:+.3f}/s, window range {stats['min']:.2f}..{stats['max']:.2f})."
+            )
+
+        if signals is not None and patterns:
+            # Attach detector context to threshold-driven decisions without changing the primary pattern
+            patterns = patterns + [f for f in signals.flags if f not in patterns]
+
         return schemas.AIResponse(
             global_space_state=global_state,
             detected_patterns=patterns,
@@ -1,13 +1,31 @@
 import asyncio
 import logging
+import os
+import time
+import uuid
+from datetime import datetime
 from .telemetry_service import TelemetryService
 from .ai_service import AIService
 from .mission_service import MissionService
+from .fleet_service import FleetHealthTracker, is_early_warning
+from .detector_service import FleetDetector
+from .episode_service import EpisodeTracker, OPENED, HEARTBEAT, CLOSED
+from .cadence_service import CadencePolicy
+from .conjunction_service import CircularOrbit, ConjunctionScreener, SCREENING_INTERVAL, conjunction_decision
 from ..database import SessionLocal
 from .. import schemas
 
 logger = logging.getLogger(__name__)
 
+# Columns a fleet snapshot can be projected to
+SNAPSHOT_FIELDS = set(schemas.TelemetryBase.model_fields) | {"satellite_type", "tick", "updated_at"}
+
+# How often queued mission status changes are written back to the missions table
+STATUS_FLUSH_INTERVAL = float(os.getenv("ORBITA_STATUS_FLUSH_INTERVAL", "5.0"))
+
+# How long shutdown waits for in-flight ticks to finish before cancelling them
+DRAIN_TIMEOUT = float(os.getenv("ORBITA_DRAIN_TIMEOUT", "5.0"))
+
 class AutonomyEngine:
     """
     Manages the lifecycle of autonomous loops for active missions.
@@ -18,38 +36,281 @@ class AutonomyEngine:
         self.ai_service = AIService()
         # In-memory measurement of last state for each mission to evolve it
         self.mission_states = {} # mission_id -> TelemetryCreate (latest)
+        # Read-side bookkeeping so polling clients never have to touch the DB
+        self.mission_types = {} # mission_id -> satellite_type
+        self.mission_ticks = {} # mission_id -> ticks processed by the current loop
+        self.mission_epochs = {} # mission_id -> loop generation (bumped on every start)
+        self.mission_updated_at = {} # mission_id -> datetime of last state change
+        self.mission_versions = {} # mission_id -> bumped on every state change (ticks and corrections)
+        self.fleet_version = 0 # bumped whenever any mission state changes
+        self.instance_id = uuid.uuid4().hex[:8] # keeps ETags unique across restarts
+        self._epoch_counter = 0
+        self.fleet_health = FleetHealthTracker()
+        self.detectors = FleetDetector()
+        self.episodes = EpisodeTracker()
+        self._background_tasks = []
+        self._ticking = set() # mission_ids currently inside a tick
+        self.mission_orbits = {} # mission_id -> CircularOrbit
+        self.screener = ConjunctionScreener()
+        self.cadence = CadencePolicy()
+        self.conjunction_report = None # summary of the last screening pass
+        self._conjunction_pairs = set() # pairs already published and still inside the threshold
+        self._orbit_epoch = time.time() # shared clock origin for propagation
+        self._draining = False
 
-    async def start_mission_loop(self, mission_id: int, satellite_type: str):
-        if mission_id in self.active_tasks:
-            return # Already running
+    async def start_mission_loop(
+        self,
+        mission_id: int,
+        satellite_type: str,
+        phase: float = 0.0,
+        altitude: float = None,
+        inclination: float = None,
+    ):
+        """
+        `phase` (0..1) delays the first tick by that fraction of the tick interval,
+        so missions started together don't all tick at the same instant.
+        """
+        if mission_id in self.active_tasks or self._draining:
+            return # Already running, or shutting down
 
         # Initialize state
         initial_telemetry = self.telemetry_service.generate_initial_telemetry(satellite_type)
         self.mission_states[mission_id] = initial_telemetry
+        self.mission_types[mission_id] = satellite_type
+        self._epoch_counter += 1
+        self.mission_epochs[mission_id] = self._epoch_counter
+        self._touch(mission_id, tick=0)
+        self.fleet_health.register_mission(mission_id, satellite_type)
+        self.mission_orbits[mission_id] = CircularOrbit.for_mission(mission_id, satellite_type, altitude, inclination)
         
-        # Determine frequency (LEO faster, GEO slower)
+        # Base frequency (LEO faster, GEO slower); the cadence policy adapts it per tick
         interval = 2.0 if satellite_type == 'LEO' else 3.0
+        self.cadence.register(mission_id, interval)
         
-        task = asyncio.create_task(self._mission_loop(mission_id, satellite_type, interval))
+        task = asyncio.create_task(self._mission_loop(mission_id, satellite_type, interval, initial_delay=phase * interval))
         self.active_tasks[mission_id] = task
-        logger.info(f"Started autonomy loop for Mission {mission_id}")
+        logger.debug(f"Started autonomy loop for Mission {mission_id}")
+
+    async def start_missions_bulk(self, missions):
+        """
+        Registers many (mission_id, satellite_type, altitude, inclination) tuples in one call,
+        with start phases spread evenly across the tick interval. Returns how many loops were started.
+        """
+        pending = [mission for mission in missions if mission[0] not in self.active_tasks]
+        for i, (mission_id, satellite_type, altitude, inclination) in enumerate(pending):
+            await self.start_mission_loop(mission_id, satellite_type, phase=i / len(pending), altitude=altitude, inclination=inclination)
+        logger.info(f"Started {len(pending)} autonomy loops")
+        return len(pending)
+
+    async def stop_missions_bulk(self, mission_ids):
+        """
+        Stops every listed mission that has a running loop. Returns the ids actually stopped.
+        """
+        stopped = []
+        released = []
+        for mission_id in mission_ids:
+            if mission_id in self.active_tasks:
+                self.active_tasks.pop(mission_id).cancel()
+                released.append(self._release_mission(mission_id))
+                stopped.append(mission_id)
+        # Open episodes of every stopped mission are closed in one write
+        await self._close_released_episodes([r for r in released if r is not None])
+        logger.info(f"Stopped {len(stopped)} autonomy loops")
+        return stopped
 
     async def stop_mission_loop(self, mission_id: int):
         if mission_id in self.active_tasks:
-            self.active_tasks[mission_id].cancel()
-            del self.active_tasks[mission_id]
-            if mission_id in self.mission_states:
-                del self.mission_states[mission_id]
-            logger.info(f"Stopped autonomy loop for Mission {mission_id}")
+            self.active_tasks.pop(mission_id).cancel()
+            released = self._release_mission(mission_id)
+            if released is not None:
+                await self._close_released_episodes([released])
+            logger.debug(f"Stopped autonomy loop for Mission {mission_id}")
+
+    def _release_mission(self, mission_id: int):
+        """
+        Drops every in-memory trace of a mission so read views stop reporting it as live.
+        Returns (mission_id, satellite_type, last telemetry, episode) when an open episode
+        had to be closed as stopped, for _close_released_episodes to persist and announce.
+        """
+        state = self.mission_states.pop(mission_id, None)
+        satellite_type = self.mission_types.get(mission_id)
+        for mission_state in (self.mission_types, self.mission_ticks, self.mission_epochs, self.mission_updated_at, self.mission_versions):
+            mission_state.pop(mission_id, None)
+        self.fleet_version += 1
+        self.fleet_health.unregister_mission(mission_id)
+        self.detectors.drop(mission_id)
+        episode = self.episodes.drop(mission_id)
+        self.mission_orbits.pop(mission_id, None)
+        self.cadence.unregister(mission_id)
+        if episode is None:
+            return None
+        return (mission_id, satellite_type, state, episode)
+
+    async def _close_released_episodes(self, released):
+        """
+        Stores the final summary of episodes closed because their loop ended, and sends
+        the "closed" transition so clients don't keep showing them as open.
+        """
+        from ..routers.websocket import manager
+
+        if not released:
+            return
+        summaries = {
+            episode.decision_log_id: episode.to_dict()
+            for _, _, _, episode in released if episode.decision_log_id is not None
+        }
+        try:
+            async with SessionLocal() as db:
+                await MissionService(db).update_episodes(summaries)
+        except Exception as e:
+            logger.error(f"Failed to store {len(summaries)} stopped episodes: {e}")
+        for mission_id, satellite_type, state, episode in released:
+            await manager.broadcast_mission_update(mission_id, {
+                "telemetry": state.model_dump() if state is not None else None,
+                "decision": None,
+                "episodes": [{"event": CLOSED, **episode.to_dict()}],
+                "source": "ENGINE"
+            }, satellite_type=satellite_type)
+
+    def start_background_tasks(self):
+        self._draining = False
+        if not self._background_tasks:
+            self._background_tasks.append(asyncio.create_task(self._status_flush_loop()))
+            self._background_tasks.append(asyncio.create_task(self._conjunction_loop()))
+
+    async def shutdown(self, drain_timeout: float = DRAIN_TIMEOUT):
+        """
+        Graceful stop: loops that are mid-tick finish that tick (telemetry/decision writes
+        included), idle loops are cancelled, then pending status writes are flushed.
+        """
+        self._draining = True
+        tasks = list(self.active_tasks.values())
+        for mission_id, task in self.active_tasks.items():
+            if mission_id not in self._ticking:
+                task.cancel()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Cancelled {len(pending)} mission ticks still running after {drain_timeout}s drain")
+                await asyncio.gather(*pending, return_exceptions=True)
+        self.active_tasks.clear()
+        # Episodes still open at shutdown end with their loops
+        await self._close_released_episodes([
+            (mission_id, self.mission_types.get(mission_id), self.mission_states.get(mission_id), self.episodes.drop(mission_id))
+            for mission_id in list(self.episodes.open_episodes)
+        ])
+
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+        # Last write-back so the missions table reflects the final state
+        await self.flush_statuses()
+
+    async def flush_statuses(self):
+        statuses = self.fleet_health.pop_dirty_statuses()
+        if not statuses:
+            return
+        try:
+            async with SessionLocal() as db:
+                await MissionService(db).update_statuses(statuses)
+        except Exception as e:
+            self.fleet_health.requeue_statuses(statuses)
+            logger.error(f"Failed to write back {len(statuses)} mission statuses: {e}")
 
-    async def _mission_loop(self, mission_id: int, satellite_type: str, interval: float, source: str = "SIM"):
+    async def _status_flush_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(STATUS_FLUSH_INTERVAL)
+                await self.flush_statuses()
+        except asyncio.CancelledError:
+            pass
+
+    async def run_conjunction_screening(self):
+        """
+        One screening pass over every active mission. Propagation runs in a worker thread;
+        newly detected close approaches are published into the decision stream.
+        """
+        from ..routers.websocket import manager
+
+        orbits = list(self.mission_orbits.values())
+        start = time.time() - self._orbit_epoch
+        result = await asyncio.to_thread(self.screener.screen, orbits, start)
+        approaches = result.pop("approaches")
+
+        # Pairs published earlier stay suppressed while still inside the threshold
+        pairs = {approach.pair for approach in approaches}
+        self._conjunction_pairs &= pairs
+        new_approaches = [a for a in approaches if a.pair not in self._conjunction_pairs]
+        self.conjunction_report = {
+            **result,
+            "screened_at": datetime.utcnow().isoformat(),
+            "threshold_km": self.screener.threshold_km,
+            "close_approaches": len(approaches),
+            "new_close_approaches": len(new_approaches),
+            "approaches": [a.to_dict() for a in approaches[:100]],
+        }
+        if not new_approaches:
+            return
+
+        # Snapshot everything before the first await: missions stopped meanwhile are simply skipped
+        updates = []
+        for approach in new_approaches:
+            for mission_id in approach.pair:
+                state = self.mission_states.get(mission_id)
+                if state is None:
+                    continue
+                decision = conjunction_decision(approach, mission_id, self.screener.threshold_km)
+                updates.append((mission_id, self.mission_types.get(mission_id), state.model_dump(), decision, approach))
+
+        try:
+            async with SessionLocal() as db:
+                await MissionService(db).log_decisions([(mission_id, decision) for mission_id, _, _, decision, _ in updates])
+        except Exception as e:
+            # Pairs stay unmarked, so the next pass publishes them again
+            logger.error(f"Failed to log {len(updates)} conjunction decisions: {e}")
+            return
+        self._conjunction_pairs.update(approach.pair for approach in new_approaches)
+
+        for mission_id, satellite_type, telemetry, decision, approach in updates:
+            self.fleet_health.anomalies.add("Conjunction")
+            await manager.broadcast_mission_update(mission_id, {
+                "telemetry": telemetry,
+                "decision": decision.model_dump(),
+                "episodes": None,
+                "conjunction": approach.to_dict(),
+                "source": "SCREENING"
+            }, satellite_type=satellite_type)
+        logger.info(f"Conjunction screening: {len(new_approaches)} new close approaches among {result['objects']} objects")
+
+    async def _conjunction_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(SCREENING_INTERVAL)
+                try:
+                    await self.run_conjunction_screening()
+                except Exception as e:
+                    logger.error(f"Conjunction screening failed: {e}")
+        except asyncio.CancelledError:
+            pass
+
+    async def _mission_loop(self, mission_id: int, satellite_type: str, interval: float, source: str = "SIM", initial_delay: float = 0.0):
         from ..routers.websocket import manager # Import here to avoid circular dependency if possible
         from .ingest_service import TelemetryIngestService
         
         ingest_service = TelemetryIngestService()
         
         try:
-            while True:
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
+            while not self._draining:
+                if not self.cadence.admit(mission_id):
+                    # Host saturated: shed this low-priority tick entirely and back off
+                    await asyncio.sleep(self.cadence.on_shed(mission_id))
+                    continue
+                self._ticking.add(mission_id)
                 async with SessionLocal() as db:
                     mission_service = MissionService(db)
                     
@@ -69,21 +330,43 @@ class AutonomyEngine:
                         new_state = self.telemetry_service.evolve_telemetry(current_state, satellite_type)
                     
                     self.mission_states[mission_id] = new_state
+                    self._touch(mission_id, tick=self.mission_ticks.get(mission_id, 0) + 1)
                     
                     # 2. Log to DB
                     # (Optional: optimization - don't log EVERY tick to DB if high frequency, but for demo it's fine)
                     await mission_service.log_telemetry(mission_id, new_state)
                     
                     # 3. AI Analysis
-                    decision = await self.ai_service.analyze_telemetry(new_state)
+                    signals = self.detectors.observe(mission_id, new_state)
+                    decision = await self.ai_service.analyze_telemetry(new_state, signals)
+                    self.fleet_health.record_decision(mission_id, decision)
                     
-                    # Only log if anomaly detected
+                    # Persist only episode transitions: one DecisionLog row per incident,
+                    # updated in place on heartbeats and marked verified on recovery
+                    transitions = self.episodes.observe(mission_id, decision, new_state)
+                    publish_decision = False
+                    episode_updates = []
+                    for event, episode in transitions:
+                        if event == OPENED:
+                            db_decision = await mission_service.log_decision(mission_id, decision, episode=episode.to_dict())
+                            episode.decision_log_id = db_decision.id
+                            publish_decision = True
+                            logger.info(f"Mission {mission_id} AI Action: {decision.selected_action}")
+                        elif event == HEARTBEAT:
+                            await mission_service.update_decision(episode.decision_log_id, decision, episode=episode.to_dict())
+                            publish_decision = True
+                        elif event == CLOSED and episode.decision_log_id is not None:
+                            await mission_service.update_decision(
+                                episode.decision_log_id, outcome_verified=episode.recovered, episode=episode.to_dict()
+                            )
+                        # Every transition goes out, so a close followed by an open in the same tick both arrive
+                        episode_updates.append({"event": event, **episode.to_dict()})
+
                     if decision.anomaly_detected:
-                        await mission_service.log_decision(mission_id, decision)
-                        
                         # Corrective Action Simulation (simple override for demo)
                         # In REAL mode, we would send commands BACK to the satellite here
-                        if source == "SIM":
+                        # Early warnings are pre-emptive: no limit was crossed, so nothing to reset
+                        if source == "SIM" and not is_early_warning(decision):
                             action_text = decision.selected_action.lower() if decision.selected_action else ""
                             reasoning_text = decision.explanation.lower()
                             
@@ -98,21 +381,86 @@ class AutonomyEngine:
                             elif "angle" in action_text:
                                  # optimize solar angle -> better battery
                                  self.mission_states[mission_id].battery_level += 5.0
-                        
-                        logger.info(f"Mission {mission_id} AI Action: {decision.selected_action}")
+                            # The correction edits the published state in place: new version, new ETag
+                            self._touch(mission_id)
 
                     # 4. Broadcast via WebSocket
+                    # Telemetry goes out every tick; the decision payload only on episode transitions
                     await manager.broadcast_mission_update(mission_id, {
                         "telemetry": new_state.model_dump(),
-                        "decision": decision.model_dump() if decision.anomaly_detected else None,
+                        "decision": decision.model_dump() if publish_decision else None,
+                        "episodes": episode_updates or None,
                         "source": source
-                    })
+                    }, satellite_type=satellite_type)
+                self._ticking.discard(mission_id)
 
+                if self._draining:
+                    break
+                interval = self.cadence.next_interval(mission_id, decision, signals)
                 await asyncio.sleep(interval)
         except asyncio.CancelledError:
             logger.info(f"Mission {mission_id} loop cancelled")
         except Exception as e:
-            logger.error(f"Error in mission loop {mission_id}: {e}")
+            logger.exception(f"Error in mission loop {mission_id}: {e}")
+            # A dead loop must not keep serving its frozen state as live, and the
+            # mission has to be restartable: clean up exactly as a stop would
+            if self.active_tasks.get(mission_id) is asyncio.current_task():
+                del self.active_tasks[mission_id]
+                released = self._release_mission(mission_id)
+                if released is not None:
+                    await self._close_released_episodes([released])
+        finally:
+            self._ticking.discard(mission_id)
+
+    def _touch(self, mission_id: int, tick: int = None):
+        if tick is not None:
+            self.mission_ticks[mission_id] = tick
+        self.mission_versions[mission_id] = self.mission_versions.get(mission_id, 0) + 1
+        self.mission_updated_at[mission_id] = datetime.utcnow()
+        self.fleet_version += 1
+
+    def mission_etag(self, mission_id: int) -> str:
+        return f'"{self.instance_id}-{mission_id}-{self.mission_epochs[mission_id]}-{self.mission_versions[mission_id]}"'
+
+    def get_latest_state(self, mission_id: int):
+        """
+        Returns the in-memory view of a running mission, or None if no loop is active.
+        """
+        state = self.mission_states.get(mission_id)
+        if state is None:
+            return None
+        return {
+            "mission_id": mission_id,
+            "satellite_type": self.mission_types.get(mission_id),
+            "tick": self.mission_ticks.get(mission_id, 0),
+            "updated_at": self.mission_updated_at[mission_id].isoformat(),
+            "interval_s": self.cadence.interval.get(mission_id),
+            "telemetry": state.model_dump(),
+        }
+
+    def fleet_snapshot(self, fields=None, satellite_type=None):
+        """
+        Flat per-mission rows for every running loop, optionally projected to `fields`.
+        """
+        rows = []
+        for mission_id, state in self.mission_states.items():
+            sat_type = self.mission_types.get(mission_id)
+            if satellite_type and sat_type != satellite_type:
+                continue
+            row = state.model_dump(include=set(fields) if fields else None)
+            row["mission_id"] = mission_id
+            if not fields or "satellite_type" in fields:
+                row["satellite_type"] = sat_type
+            if not fields or "tick" in fields:
+                row["tick"] = self.mission_ticks.get(mission_id, 0)
+            if not fields or "updated_at" in fields:
+                row["updated_at"] = self.mission_updated_at[mission_id].isoformat()
+            rows.append(row)
+        return {
+            "version": self.fleet_version,
+            "count": len(rows),
+            "missions": rows,
+        }
             
 # Global instance
 engine = AutonomyEngine()
@@ -0,0 +1,172 @@
+import os
+import random
+import time
+from collections import deque
+from typing import Dict, Optional
+from .. import schemas
+from .detector_service import DetectorSignals
+from .fleet_service import status_for_decision
+
+# Fleet-wide processing budget in mission ticks per second
+TICK_BUDGET = float(os.getenv("ORBITA_TICK_BUDGET", "200"))
+
+# Interval bounds relative to a mission's base interval (2s LEO, 3s otherwise)
+FAST_FACTOR = 0.25  # anomalous
+ELEVATED_FACTOR = 0.5  # trending toward a threshold
+SLOW_FACTOR = 4.0  # quiet for a while
+BACKOFF = 1.25  # nominal ticks stretch the interval by this much, up to SLOW_FACTOR
+SHED_JITTER = 0.5  # shed retries are spread over +/- this fraction of the interval
+MAX_STRETCH = 10.0  # cap on budget-driven stretching of low-priority missions
+
+NOMINAL = 0
+ELEVATED = 1
+CRITICAL = 2
+PRIORITY_NAMES = {NOMINAL: "nominal", ELEVATED: "elevated", CRITICAL: "critical"}
+
+
+class CadencePolicy:
+    """
+    Adaptive per-mission tick interval under a global ticks-per-second budget.
+
+    Each mission's desired rate follows its risk: fast while anomalous, faster while
+    a detector sees a trend heading for a limit, and backing off while nominal.
+    Desired rates are summed per priority incrementally; when the total exceeds the
+    budget, nominal missions are stretched first. A token bucket on actual ticks
+    sheds nominal ticks outright when the host is saturated.
+    """
+    def __init__(self, budget: float = TICK_BUDGET):
+        self.budget = budget
+        self.base_interval: Dict[int, float] = {}
+        self.interval: Dict[int, float] = {}  # desired, before budget stretching
+        self.priority: Dict[int, int] = {}
+        self._demand = {NOMINAL: 0.0, ELEVATED: 0.0, CRITICAL: 0.0}  # sum of desired rates per priority
+        self._tokens = budget
+        self._refilled = time.monotonic()
+        self.shed_ticks = {NOMINAL: 0, ELEVATED: 0, CRITICAL: 0}
+        self.stretched_ticks = 0
+        self.recent_sheds = deque(maxlen=50)  # (timestamp, mission_id)
+        self._tick_times = deque()  # admitted tick timestamps over the last second
+
+    def register(self, mission_id: int, base_interval: float):
+        self.base_interval[mission_id] = base_interval
+        self._set(mission_id, base_interval, NOMINAL)
+
+    def unregister(self, mission_id: int):
+        if mission_id not in self.base_interval:
+            return
+        self._demand[self.priority.pop(mission_id)] -= 1.0 / self.interval.pop(mission_id)
+        del self.base_interval[mission_id]
+
+    def _set(self, mission_id: int, interval: float, priority: int):
+        if mission_id in self.interval:
+            self._demand[self.priority[mission_id]] -= 1.0 / self.interval[mission_id]
+        self.interval[mission_id] = interval
+        self.priority[mission_id] = priority
+        self._demand[priority] += 1.0 / interval
+
+    def next_interval(
+        self,
+        mission_id: int,
+        decision: schemas.AIResponse,
+        signals: Optional[DetectorSignals] = None,
+    ) -> float:
+        """
+        Updates the mission's desired cadence from its latest decision and returns the
+        interval to sleep, after any stretching the global budget requires.
+        """
+        base = self.base_interval[mission_id]
+        status = status_for_decision(decision)
+        early_warning = decision.risk_assessment.upper().startswith("ELEVATED")
+        if status == "critical":
+            priority, interval = CRITICAL, base * FAST_FACTOR
+        elif status == "warning" and not early_warning:
+            # Hard-threshold anomaly below critical severity
+            priority, interval = ELEVATED, base * FAST_FACTOR
+        elif early_warning or (signals is not None and signals.flags):
+            # Trending toward a threshold
+            priority, interval = ELEVATED, base * ELEVATED_FACTOR
+        else:
+            priority, interval = NOMINAL, self._backoff(mission_id)
+        self._set(mission_id, interval, priority)
+        return interval * self._stretch(priority)
+
+    def on_shed(self, mission_id: int) -> float:
+        """
+        Called instead of next_interval when admit() shed the tick. A shed tick is a
+        nominal tick: back off the same way, so missions shed from the start still slow
+        down (and leave the demand total) instead of retrying at their base rate.
+        The retry is jittered: missions shed in the same burst would otherwise all
+        come back together and be shed again.
+        """
+        interval = self._backoff(mission_id)
+        self._set(mission_id, interval, NOMINAL)
+        return interval * self._stretch(NOMINAL) * random.uniform(1 - SHED_JITTER, 1 + SHED_JITTER)
+
+    def _backoff(self, mission_id: int) -> float:
+        base = self.base_interval[mission_id]
+        interval = min(self.interval.get(mission_id, base) * BACKOFF, base * SLOW_FACTOR)
+        return max(interval, base * FAST_FACTOR)
+
+    def _stretch(self, priority: int) -> float:
+        total = sum(self._demand.values())
+        if total <= self.budget:
+            return 1.0
+        urgent = self._demand[CRITICAL] + self._demand[ELEVATED]
+        if priority == NOMINAL:
+            headroom = self.budget - urgent
+            stretch = MAX_STRETCH if headroom <= 0 else min(MAX_STRETCH, self._demand[NOMINAL] / headroom)
+        else:
+            # Only when the urgent missions alone exceed the budget are they slowed, proportionally
+            stretch = max(1.0, urgent / self.budget)
+        if stretch > 1.0:
+            self.stretched_ticks += 1
+        return stretch
+
+    def admit(self, mission_id: int) -> bool:
+        """
+        Token bucket over actual ticks. Critical and elevated ticks always run (and may
+        drive the bucket into debt); nominal ticks are shed when no token is left.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.budget, self._tokens + (now - self._refilled) * self.budget)
+        self._refilled = now
+        priority = self.priority.get(mission_id, NOMINAL)
+        if priority == NOMINAL and self._tokens < 1.0:
+            self.shed_ticks[priority] += 1
+            self.recent_sheds.append((time.time(), mission_id))
+            return False
+        self._tokens = max(-self.budget, self._tokens - 1.0)
+        self._tick_times.append(now)
+        self._trim_tick_times(now)
+        return True
+
+    def _trim_tick_times(self, now: float):
+        while self._tick_times and self._tick_times[0] <= now - 1.0:
+            self._tick_times.popleft()
+
+    def status(self, include_missions: bool = False) -> dict:
+        self._trim_tick_times(time.monotonic())
+        demand = max(0.0, sum(self._demand.values()))  # float drift can leave -0.0 when empty
+        result = {
+            "budget_tps": self.budget,
+            "demand_tps": round(demand, 2),
+            "actual_tps": len(self._tick_times),
+            "saturated": demand > self.budget,
+            "demand_by_priority": {PRIORITY_NAMES[p]: round(max(0.0, d), 2) for p, d in self._demand.items()},
+            "missions_by_priority": {
+                PRIORITY_NAMES[p]: sum(1 for v in self.priority.values() if v == p) for p in PRIORITY_NAMES
+            },
+            "shed_ticks": {PRIORITY_NAMES[p]: n for p, n in self.shed_ticks.items()},
+            "stretched_ticks": self.stretched_ticks,
+            "recent_sheds": [{"at": at, "mission_id": mission_id} for at, mission_id in self.recent_sheds],
+        }
+        if include_missions:
+            result["missions"] = {
+                mission_id: {
+                    "interval_s": round(interval, 3),
+                    "rate_hz": round(1.0 / interval, 3),
+                    "priority": PRIORITY_NAMES[self.priority[mission_id]],
+                }
+                for mission_id, interval in self.interval.items()
+            }
+        return result
@@ -0,0 +1,288 @@
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from .. import schemas
+
+EARTH_RADIUS_KM = 6371.0
+EARTH_MU = 398600.4418  # km^3/s^2
+
+# Used when a mission was started without orbit parameters
+DEFAULT_ALTITUDES = {"LEO": 550.0, "MEO": 20200.0, "GEO": 35786.0}
+DEFAULT_INCLINATIONS = {"LEO": 53.0, "MEO": 55.0, "GEO": 0.0}
+
+SCREENING_INTERVAL = float(os.getenv("ORBITA_CONJUNCTION_INTERVAL", "60"))
+SCREENING_THRESHOLD_KM = float(os.getenv("ORBITA_CONJUNCTION_THRESHOLD_KM", "5"))
+SCREENING_EPOCHS = int(os.getenv("ORBITA_CONJUNCTION_EPOCHS", "10"))
+SCREENING_STEP = float(os.getenv("ORBITA_CONJUNCTION_STEP", "30"))  # seconds between epochs
+
+# Newton steps when refining a candidate pair's time of closest approach
+REFINE_ITERATIONS = 6
+REFINE_TOLERANCE = 1e-3  # seconds
+
+# Grid cells are packed into one int key (cheaper to hash than a tuple)
+_CELL_SPAN = 1 << 20
+_CELL_BIAS = 1 << 19
+# Half of the 26 neighbouring cells; with same-cell pairs this visits every pair exactly once
+_NEIGHBOUR_OFFSETS = [
+    (dx * _CELL_SPAN + dy) * _CELL_SPAN + dz
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+class CircularOrbit:
+    """
+    Circular two-body orbit. Missions only store altitude and inclination, so RAAN and
+    initial argument of latitude are derived deterministically from the mission id.
+    """
+    __slots__ = ("mission_id", "radius", "cos_i", "sin_i", "cos_raan", "sin_raan", "phase", "mean_motion", "speed")
+
+    def __init__(self, mission_id: int, altitude: float, inclination: float):
+        rng = random.Random(mission_id)
+        raan = rng.uniform(0, 2 * math.pi)
+        inc = math.radians(inclination)
+        self.mission_id = mission_id
+        self.radius = EARTH_RADIUS_KM + altitude
+        self.cos_i, self.sin_i = math.cos(inc), math.sin(inc)
+        self.cos_raan, self.sin_raan = math.cos(raan), math.sin(raan)
+        self.phase = rng.uniform(0, 2 * math.pi)
+        self.mean_motion = math.sqrt(EARTH_MU / self.radius ** 3)
+        self.speed = self.radius * self.mean_motion  # km/s
+
+    @classmethod
+    def for_mission(cls, mission_id: int, satellite_type: str, altitude: Optional[float], inclination: Optional[float]):
+        if altitude is None:
+            altitude = DEFAULT_ALTITUDES.get(satellite_type, DEFAULT_ALTITUDES["LEO"])
+        if inclination is None:
+            inclination = DEFAULT_INCLINATIONS.get(satellite_type, DEFAULT_INCLINATIONS["LEO"])
+        return cls(mission_id, altitude, inclination)
+
+    def position(self, t: float) -> Tuple[float, float, float]:
+        u = self.phase + self.mean_motion * t
+        cos_u, sin_u = math.cos(u), math.sin(u)
+        r = self.radius
+        return (
+            r * (self.cos_raan * cos_u - self.sin_raan * sin_u * self.cos_i),
+            r * (self.sin_raan * cos_u + self.cos_raan * sin_u * self.cos_i),
+            r * sin_u * self.sin_i,
+        )
+
+    def state(self, t: float) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+        """
+        Position (km) and velocity (km/s) at `t`.
+        """
+        u = self.phase + self.mean_motion * t
+        cos_u, sin_u = math.cos(u), math.sin(u)
+        r = self.radius
+        v = self.speed
+        return (
+            (
+                r * (self.cos_raan * cos_u - self.sin_raan * sin_u * self.cos_i),
+                r * (self.sin_raan * cos_u + self.cos_raan * sin_u * self.cos_i),
+                r * sin_u * self.sin_i,
+            ),
+            (
+                -v * (self.cos_raan * sin_u + self.sin_raan * cos_u * self.cos_i),
+                v * (self.cos_raan * cos_u * self.cos_i - self.sin_raan * sin_u),
+                v * cos_u * self.sin_i,
+            ),
+        )
+
+
+class CloseApproach:
+    __slots__ = ("mission_a", "mission_b", "distance_km", "time_offset")
+
+    def __init__(self, mission_a: int, mission_b: int, distance_km: float, time_offset: float):
+        self.mission_a = mission_a
+        self.mission_b = mission_b
+        self.distance_km = distance_km
+        self.time_offset = time_offset
+
+    @property
+    def pair(self) -> Tuple[int, int]:
+        return (self.mission_a, self.mission_b)
+
+    def to_dict(self) -> dict:
+        return {
+            "mission_a": self.mission_a,
+            "mission_b": self.mission_b,
+            "distance_km": round(self.distance_km, 3),
+            "time_offset_s": round(self.time_offset, 1),
+        }
+
+
+class ConjunctionScreener:
+    """
+    Finds close approaches among all active missions without comparing every pair.
+
+    1. Altitude shells: circular orbits keep a constant radius, so objects whose shell
+       has no neighbour within the threshold can never conjunct and are skipped.
+    2. Per epoch, the remaining objects go into a uniform 3D hash grid and only objects
+       in the same or adjacent cells are compared. Closest approach usually falls between
+       epochs, when the pair is up to (max relative speed x step / 2) further apart at the
+       nearest epoch, so cells and the candidate radius are the threshold plus that margin.
+    3. Each candidate pair is refined to its actual time and distance of closest approach
+       around that epoch, and only refined distances are tested against the threshold.
+       Pairs whose straight-line miss distance (from the epoch's relative state) is beyond
+       the threshold plus the worst-case curvature of the relative path are rejected first.
+    Expected cost is O(n) per epoch instead of O(n^2).
+    """
+    def __init__(
+        self,
+        threshold_km: float = SCREENING_THRESHOLD_KM,
+        epochs: int = SCREENING_EPOCHS,
+        step: float = SCREENING_STEP,
+    ):
+        self.threshold_km = threshold_km
+        self.epochs = epochs
+        self.step = step
+
+    def _shell_candidates(self, orbits: List[CircularOrbit]) -> List[CircularOrbit]:
+        shells = defaultdict(int)
+        for orbit in orbits:
+            shells[int(orbit.radius // self.threshold_km)] += 1
+        candidates = []
+        for orbit in orbits:
+            shell = int(orbit.radius // self.threshold_km)
+            if shells[shell] + shells.get(shell - 1, 0) + shells.get(shell + 1, 0) > 1:
+                candidates.append(orbit)
+        return candidates
+
+    def search_radius(self, candidates: List[CircularOrbit]) -> float:
+        if self.epochs < 2:
+            return self.threshold_km
+        # Two circular orbits close at most at the sum of their speeds
+        max_relative_speed = 2 * max((orbit.speed for orbit in candidates), default=0.0)
+        return self.threshold_km + max_relative_speed * self.step / 2
+
+    def curvature_margin(self, candidates: List[CircularOrbit]) -> float:
+        # Relative motion departs from a straight line by at most 1/2 * a_rel * dt^2,
+        # with a_rel bounded by the two gravitational accelerations and dt by step / 2
+        max_relative_accel = 2 * max((EARTH_MU / orbit.radius ** 2 for orbit in candidates), default=0.0)
+        return 0.5 * max_relative_accel * (self.step / 2) ** 2
+
+    @staticmethod
+    def closest_approach(a: CircularOrbit, b: CircularOrbit, t: float, lo: float, hi: float) -> Tuple[float, float]:
+        """
+        Time in [lo, hi] and distance of the pair's closest approach near `t`. Each Newton
+        step solves the straight-line encounter from the current relative state; over one
+        screening step the relative motion is close to linear, so a few steps converge.
+        """
+        for _ in range(REFINE_ITERATIONS):
+            (xa, ya, za), (vxa, vya, vza) = a.state(t)
+            (xb, yb, zb), (vxb, vyb, vzb) = b.state(t)
+            rx, ry, rz = xa - xb, ya - yb, za - zb
+            vx, vy, vz = vxa - vxb, vya - vyb, vza - vzb
+            v_sq = vx * vx + vy * vy + vz * vz
+            if v_sq < 1e-12:
+                break  # co-moving: separation is constant
+            refined = min(hi, max(lo, t - (rx * vx + ry * vy + rz * vz) / v_sq))
+            converged = abs(refined - t) < REFINE_TOLERANCE
+            t = refined
+            if converged:
+                break
+        xa, ya, za = a.position(t)
+        xb, yb, zb = b.position(t)
+        return t, math.sqrt((xa - xb) ** 2 + (ya - yb) ** 2 + (za - zb) ** 2)
+
+    def screen(self, orbits: Iterable[CircularOrbit], start: float) -> Dict[str, object]:
+        """
+        Screens the window from `start` (seconds on the shared clock) over `epochs` common
+        epochs and returns the refined closest approach per pair under the threshold.
+        """
+        started = time.perf_counter()
+        orbits = list(orbits)
+        candidates = self._shell_candidates(orbits)
+        by_id = {orbit.mission_id: orbit for orbit in candidates}
+        cell = self.search_radius(candidates)
+        search_sq = cell ** 2
+        reject_sq = (self.threshold_km + self.curvature_margin(candidates)) ** 2
+        window_end = start + (self.epochs - 1) * self.step
+        closest: Dict[Tuple[int, int], CloseApproach] = {}
+        comparisons = 0
+        refinements = 0
+
+        for k in range(self.epochs):
+            t = start + k * self.step
+            # The nearest epoch to any closest approach is within step / 2 of it
+            lo, hi = max(start, t - self.step / 2), min(window_end, t + self.step / 2)
+            grid = defaultdict(list)
+            for orbit in candidates:
+                (x, y, z), velocity = orbit.state(t)
+                key = ((int(x // cell) + _CELL_BIAS) * _CELL_SPAN + int(y // cell) + _CELL_BIAS) * _CELL_SPAN + int(z // cell) + _CELL_BIAS
+                grid[key].append((orbit.mission_id, x, y, z, velocity))
+
+            get = grid.get
+            for key, members in grid.items():
+                neighbours = [members]
+                for delta in _NEIGHBOUR_OFFSETS:
+                    other = get(key + delta)
+                    if other:
+                        neighbours.append(other)
+                for i, (id_a, xa, ya, za, (vxa, vya, vza)) in enumerate(members):
+                    for j, bucket in enumerate(neighbours):
+                        # Same cell: only later members, so each pair is seen once
+                        for id_b, xb, yb, zb, (vxb, vyb, vzb) in (bucket[i + 1:] if j == 0 else bucket):
+                            comparisons += 1
+                            rx, ry, rz = xa - xb, ya - yb, za - zb
+                            if rx * rx + ry * ry + rz * rz > search_sq:
+                                continue
+                            # Straight-line encounter from this epoch's relative state; the true
+                            # path is within the curvature margin of it across the window
+                            vx, vy, vz = vxa - vxb, vya - vyb, vza - vzb
+                            v_sq = vx * vx + vy * vy + vz * vz
+                            dt = 0.0 if v_sq < 1e-12 else min(hi - t, max(lo - t, -(rx * vx + ry * vy + rz * vz) / v_sq))
+                            if (rx + vx * dt) ** 2 + (ry + vy * dt) ** 2 + (rz + vz * dt) ** 2 > reject_sq:
+                                continue
+                            pair = (id_a, id_b) if id_a < id_b else (id_b, id_a)
+                            refinements += 1
+                            t_ca, distance = self.closest_approach(by_id[pair[0]], by_id[pair[1]], t + dt, lo, hi)
+                            if distance > self.threshold_km:
+                                continue
+                            best = closest.get(pair)
+                            if best is None or distance < best.distance_km:
+                                closest[pair] = CloseApproach(pair[0], pair[1], distance, t_ca - start)
+
+        return {
+            "objects": len(orbits),
+            "screened": len(candidates),
+            "epochs": self.epochs,
+            "search_radius_km": round(cell, 1),
+            "comparisons": comparisons,
+            "refinements": refinements,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "approaches": sorted(closest.values(), key=lambda a: a.distance_km),
+        }
+
+
+def conjunction_decision(approach: CloseApproach, mission_id: int, threshold_km: float) -> schemas.AIResponse:
+    """
+    Wraps a close approach in the standard decision contract for one of the two missions.
+    """
+    other = approach.mission_b if mission_id == approach.mission_a else approach.mission_a
+    severity = 1.0 - approach.distance_km / threshold_km
+    return schemas.AIResponse(
+        global_space_state="CONJUNCTION ALERT - Close approach detected in shared orbital shell.",
+        detected_patterns=[
+            f"Conjunction with Mission {other}",
+            f"Predicted miss distance {approach.distance_km:.2f} km at T+{approach.time_offset:.0f} s",
+        ],
+        predicted_events=[
+            schemas.PredictedEvent(
+                event=f"Close approach with Mission {other} ({approach.distance_km:.2f} km)",
+                probability=round(0.5 + 0.5 * severity, 2),
+                time_horizon=f"T+{approach.time_offset:.0f} s",
+            )
+        ],
+        risk_assessment=("HIGH" if severity > 0.5 else "MODERATE") + ": Collision risk with constellation member.",
+        coordination_recommendations=[
+            f"PLAN: Collision avoidance maneuver coordinated with Mission {other}",
+            "Refine orbit determination before committing delta-v",
+        ],
+        counterfactual_insights="Without a maneuver the pair remains inside the screening threshold at closest approach.",
+        confidence=0.85,
+        explanation=f"Constellation screening refined the pair's closest approach between common epochs; separation falls below {threshold_km:g} km.",
+    )
@@ -0,0 +1,215 @@
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from .. import schemas
+
+# Metrics tracked per mission, with the direction that counts as "bad":
+# -1 = falling is bad, +1 = rising is bad, 0 = either way
+TRACKED_METRICS = {
+    "battery_level": -1,
+    "thermal_state": 1,
+    "orientation_roll": 0,
+    "signal_latency": 1,
+}
+
+# Hard limits used by the rule cascade; trends are projected against these
+THRESHOLDS = {
+    "battery_level": 20.0,
+    "thermal_state": 80.0,
+    "orientation_roll": 10.0,
+}
+
+EWMA_ALPHA = 0.1
+RATE_ALPHA = 0.3  # rate of change reacts faster than the level baseline
+WINDOW_SIZE = 30  # samples kept for rolling min/max
+WARMUP_SAMPLES = 10  # no z-score flags until the baseline has settled
+Z_THRESHOLD = 3.0
+TREND_HORIZON = 120.0  # seconds; flag trends projected to cross a limit within this
+
+
+def wrap_angle(degrees: float) -> float:
+    """
+    Maps an angle onto [-180, 180) so 359.9 reads as -0.1.
+    """
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+class MetricStats:
+    """
+    Constant-memory streaming statistics for one metric: EWMA mean/variance,
+    rolling min/max (monotonic deques) and a smoothed rate of change per second.
+    """
+    __slots__ = ("alpha", "window", "count", "mean", "var", "rate", "last", "last_time", "_min", "_max")
+
+    def __init__(self, alpha: float = EWMA_ALPHA, window: int = WINDOW_SIZE):
+        self.alpha = alpha
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.rate = 0.0
+        self.last = None
+        self.last_time = None
+        self._min = deque()  # (index, value), values increasing
+        self._max = deque()  # (index, value), values decreasing
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    @property
+    def minimum(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def zscore(self, value: float) -> float:
+        if self.count < WARMUP_SAMPLES or self.var <= 1e-9:
+            return 0.0
+        return (value - self.mean) / self.std
+
+    def update(self, value: float, now: float) -> float:
+        """
+        Folds in a sample and returns its z-score against the baseline *before* the update.
+        """
+        z = self.zscore(value)
+
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+
+            dt = now - self.last_time
+            if dt > 0:
+                instant_rate = (value - self.last) / dt
+                if self.count == 1:
+                    self.rate = instant_rate
+                else:
+                    self.rate += RATE_ALPHA * (instant_rate - self.rate)
+
+        index = self.count
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        for extremes in (self._min, self._max):
+            if extremes[0][0] <= index - self.window:
+                extremes.popleft()
+
+        self.count += 1
+        self.last = value
+        self.last_time = now
+        return z
+
+
+class DetectorSignals:
+    """
+    Per-sample output of a mission's detectors: summary stats per metric plus anomaly flags.
+    """
+    def __init__(self):
+        self.metrics: Dict[str, dict] = {}
+        self.flags: List[str] = []
+        # metric -> seconds until its threshold is crossed at the current trend
+        self.projections: Dict[str, float] = {}
+
+    @property
+    def max_abs_z(self) -> float:
+        return max((abs(m["z"]) for m in self.metrics.values()), default=0.0)
+
+    @property
+    def primary_metric(self) -> Optional[str]:
+        """
+        The metric behind the most urgent flag (soonest projected crossing, else largest z).
+        """
+        if self.projections:
+            return min(self.projections, key=self.projections.get)
+        flagged = [name for name, m in self.metrics.items() if m["flagged"]]
+        if flagged:
+            return max(flagged, key=lambda name: abs(self.metrics[name]["z"]))
+        return None
+
+    def to_dict(self) -> dict:
+        return {"metrics": self.metrics, "flags": self.flags, "projections": self.projections}
+
+
+class MissionDetector:
+    """
+    Streaming detectors for a single mission.
+    """
+    def __init__(self):
+        self.stats = {metric: MetricStats() for metric in TRACKED_METRICS}
+
+    def update(self, telemetry: schemas.TelemetryCreate, now: Optional[float] = None) -> DetectorSignals:
+        now = now if now is not None else time.monotonic()
+        signals = DetectorSignals()
+
+        for metric, direction in TRACKED_METRICS.items():
+            value = getattr(telemetry, metric)
+            if metric == "orientation_roll":
+                value = wrap_angle(value)
+            stats = self.stats[metric]
+            z = stats.update(value, now)
+
+            flagged = abs(z) >= Z_THRESHOLD and (direction == 0 or z * direction > 0)
+            if flagged:
+                signals.flags.append(f"{metric} deviation {z:+.1f} sigma from EWMA baseline")
+
+            eta = self._time_to_threshold(metric, value, stats)
+            if eta is not None:
+                signals.projections[metric] = eta
+                signals.flags.append(f"{metric} trend projected to cross {THRESHOLDS[metric]:g} in {eta:.0f}s")
+
+            signals.metrics[metric] = {
+                "value": value,
+                "mean": stats.mean,
+                "std": stats.std,
+                "z": z,
+                "min": stats.minimum,
+                "max": stats.maximum,
+                "rate": stats.rate,
+                "flagged": flagged,
+            }
+        return signals
+
+    @staticmethod
+    def _time_to_threshold(metric: str, value: float, stats: MetricStats) -> Optional[float]:
+        limit = THRESHOLDS.get(metric)
+        if limit is None or stats.count < WARMUP_SAMPLES or stats.rate == 0:
+            return None
+        if metric == "battery_level":
+            remaining, closing = value - limit, -stats.rate
+        elif metric == "thermal_state":
+            remaining, closing = limit - value, stats.rate
+        else:
+            remaining, closing = limit - abs(value), stats.rate if value >= 0 else -stats.rate
+        # Already past the limit is the rule cascade's job; only project approaching trends
+        if remaining <= 0 or closing <= 0:
+            return None
+        eta = remaining / closing
+        return eta if eta <= TREND_HORIZON else None
+
+
+class FleetDetector:
+    """
+    Holds one MissionDetector per mission. Each sample is scored as it arrives,
+    in O(1), so a tick's decision never waits on other missions' samples.
+    """
+    def __init__(self):
+        self.detectors: Dict[int, MissionDetector] = {}
+
+    def observe(self, mission_id: int, telemetry: schemas.TelemetryCreate, now: Optional[float] = None) -> DetectorSignals:
+        detector = self.detectors.get(mission_id)
+        if detector is None:
+            detector = self.detectors[mission_id] = MissionDetector()
+        return detector.update(telemetry, now)
+
+    def drop(self, mission_id: int):
+        self.detectors.pop(mission_id, None)
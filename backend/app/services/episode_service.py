@@ -0,0 +1,125 @@
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .. import schemas
+from .detector_service import wrap_angle
+
+# Seconds between re-persisting/re-broadcasting a still-open episode
+HEARTBEAT_INTERVAL = float(os.getenv("ORBITA_EPISODE_HEARTBEAT", "30"))
+
+OPENED = "opened"
+HEARTBEAT = "heartbeat"
+CLOSED = "closed"
+
+
+class AnomalyEpisode:
+    """
+    One continuous run of the same anomaly type on a mission, updated in place every tick.
+    """
+    def __init__(self, mission_id: int, decision: schemas.AIResponse, telemetry: schemas.TelemetryCreate, now: float):
+        self.mission_id = mission_id
+        self.anomaly_type = decision.anomaly_type
+        self.opened_at = datetime.utcnow()
+        self.closed_at = None
+        self.recovered = None
+        self.stopped = False  # closed because the mission loop ended, outcome unknown
+        self.decision_log_id = None  # DecisionLog row this episode is persisted to
+        self.ticks = 0
+        self.min_battery = telemetry.battery_level
+        self.max_thermal = telemetry.thermal_state
+        self.max_abs_roll = abs(wrap_angle(telemetry.orientation_roll))
+        self.min_confidence = decision.confidence
+        self.max_confidence = decision.confidence
+        self._started = now
+        self.last_seen = now
+        self.last_emitted = now
+        self.update(decision, telemetry, now)
+
+    @property
+    def duration(self) -> float:
+        return self.last_seen - self._started
+
+    def update(self, decision: schemas.AIResponse, telemetry: schemas.TelemetryCreate, now: float):
+        self.ticks += 1
+        self.last_seen = now
+        self.min_battery = min(self.min_battery, telemetry.battery_level)
+        self.max_thermal = max(self.max_thermal, telemetry.thermal_state)
+        self.max_abs_roll = max(self.max_abs_roll, abs(wrap_angle(telemetry.orientation_roll)))
+        self.min_confidence = min(self.min_confidence, decision.confidence)
+        self.max_confidence = max(self.max_confidence, decision.confidence)
+
+    def close(self, recovered: Optional[bool], stopped: bool = False):
+        self.closed_at = datetime.utcnow()
+        self.recovered = recovered
+        self.stopped = stopped
+
+    def to_dict(self) -> dict:
+        return {
+            "mission_id": self.mission_id,
+            "anomaly_type": self.anomaly_type,
+            "decision_log_id": self.decision_log_id,
+            "opened_at": self.opened_at.isoformat(),
+            "closed_at": self.closed_at.isoformat() if self.closed_at else None,
+            "recovered": self.recovered,
+            "stopped": self.stopped,
+            "duration_s": round(self.duration, 3),
+            "ticks": self.ticks,
+            "peak": {
+                "min_battery_level": self.min_battery,
+                "max_thermal_state": self.max_thermal,
+                "max_abs_roll": self.max_abs_roll,
+            },
+            "confidence_range": [self.min_confidence, self.max_confidence],
+        }
+
+
+class EpisodeTracker:
+    """
+    Coalesces per-tick anomaly decisions into episodes.
+    `observe` returns only the transitions worth persisting or broadcasting:
+    an episode opening, a heartbeat while it stays open, and its closure.
+    """
+    def __init__(self, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        self.heartbeat_interval = heartbeat_interval
+        self.open_episodes: Dict[int, AnomalyEpisode] = {}
+
+    def observe(
+        self,
+        mission_id: int,
+        decision: schemas.AIResponse,
+        telemetry: schemas.TelemetryCreate,
+        now: Optional[float] = None,
+    ) -> List[Tuple[str, AnomalyEpisode]]:
+        now = now if now is not None else time.monotonic()
+        transitions = []
+        episode = self.open_episodes.get(mission_id)
+
+        if episode is not None and (not decision.anomaly_detected or decision.anomaly_type != episode.anomaly_type):
+            # Recovered, or the mission moved on to a different anomaly
+            episode.close(recovered=not decision.anomaly_detected)
+            del self.open_episodes[mission_id]
+            transitions.append((CLOSED, episode))
+            episode = None
+
+        if not decision.anomaly_detected:
+            return transitions
+
+        if episode is None:
+            episode = self.open_episodes[mission_id] = AnomalyEpisode(mission_id, decision, telemetry, now)
+            transitions.append((OPENED, episode))
+        else:
+            episode.update(decision, telemetry, now)
+            if now - episode.last_emitted >= self.heartbeat_interval:
+                episode.last_emitted = now
+                transitions.append((HEARTBEAT, episode))
+        return transitions
+
+    def drop(self, mission_id: int) -> Optional[AnomalyEpisode]:
+        """
+        Forgets a mission whose loop ended, closing its open episode (if any) as stopped.
+        """
+        episode = self.open_episodes.pop(mission_id, None)
+        if episode is not None:
+            episode.close(recovered=None, stopped=True)
+        return episode
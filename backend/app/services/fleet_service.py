@@ -0,0 +1,169 @@
+import time
+from collections import Counter, deque
+from typing import Dict, Optional
+from .. import schemas
+
+# Trailing windows (seconds) for anomaly rates
+ANOMALY_WINDOWS = (60, 300, 900)
+
+
+def status_for_decision(decision: schemas.AIResponse) -> str:
+    """
+    Maps an AI decision onto the mission status vocabulary (nominal, warning, critical).
+    """
+    if not decision.anomaly_detected:
+        return "nominal"
+    if decision.risk_assessment.upper().startswith(("CRITICAL", "HIGH")):
+        return "critical"
+    return "warning"
+
+
+def is_early_warning(decision: schemas.AIResponse) -> bool:
+    """
+    True for detector trend pre-warnings, which flag an anomaly before any hard limit is crossed.
+    """
+    return decision.anomaly_detected and decision.risk_assessment.upper().startswith("ELEVATED")
+
+
+class SlidingWindowCounter:
+    """
+    Event counts per key over several trailing windows.
+    Events are bucketed per second; each bucket is added and expired exactly once
+    per window, so updates are amortised O(1) regardless of the event rate.
+    """
+    def __init__(self, windows=ANOMALY_WINDOWS):
+        self.windows = windows
+        self._buckets = {w: deque() for w in windows}  # window -> deque[(second, Counter)]
+        self._totals = {w: Counter() for w in windows}
+
+    def add(self, key: str, now: Optional[float] = None):
+        second = int(now if now is not None else time.time())
+        bucket = None
+        for w in self.windows:
+            buckets = self._buckets[w]
+            if buckets and buckets[-1][0] == second:
+                bucket = buckets[-1][1]
+            else:
+                # All windows share the same per-second Counter
+                if bucket is None:
+                    bucket = Counter()
+                buckets.append((second, bucket))
+            self._totals[w][key] += 1
+        bucket[key] += 1
+        self._expire(second)
+
+    def _expire(self, second: int):
+        for w in self.windows:
+            buckets = self._buckets[w]
+            totals = self._totals[w]
+            while buckets and buckets[0][0] <= second - w:
+                _, expired = buckets.popleft()
+                for key, count in expired.items():
+                    totals[key] -= count
+                    if totals[key] <= 0:
+                        del totals[key]
+
+    def totals(self, now: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        self._expire(int(now if now is not None else time.time()))
+        return {f"{w}s": dict(self._totals[w]) for w in self.windows}
+
+
+class FleetHealthTracker:
+    """
+    Live fleet aggregates, updated in O(1) per processed tick.
+    Mission status changes are queued here and written back in batches by the autonomy engine.
+    """
+    def __init__(self):
+        self.missions_by_status = Counter()
+        self.missions_by_type = Counter()
+        self.autonomy_modes = Counter()
+        self.anomalies = SlidingWindowCounter()
+
+        self._types = {}  # mission_id -> satellite_type
+        self._status = {}  # mission_id -> current status
+        self._mode = {}  # mission_id -> current autonomy mode
+        self._confidence = {}  # mission_id -> latest confidence
+        self._confidence_sum = 0.0  # sum of latest confidences across missions
+        self._ticks = 0
+        self._ticks_confidence_sum = 0.0
+        self._dirty_status = {}  # mission_id -> status awaiting DB write-back
+
+    def register_mission(self, mission_id: int, satellite_type: str):
+        if mission_id in self._types:
+            return
+        self._types[mission_id] = satellite_type
+        self.missions_by_type[satellite_type] += 1
+        self._status[mission_id] = "nominal"
+        self.missions_by_status["nominal"] += 1
+        # Sync the stored status on the first flush, whatever it was left at
+        self._dirty_status[mission_id] = "nominal"
+
+    def unregister_mission(self, mission_id: int):
+        sat_type = self._types.pop(mission_id, None)
+        if sat_type is None:
+            return
+        self._decrement(self.missions_by_type, sat_type)
+        self._decrement(self.missions_by_status, self._status.pop(mission_id))
+        mode = self._mode.pop(mission_id, None)
+        if mode:
+            self._decrement(self.autonomy_modes, mode)
+        self._confidence_sum -= self._confidence.pop(mission_id, 0.0)
+
+    def record_decision(self, mission_id: int, decision: schemas.AIResponse, now: Optional[float] = None):
+        if mission_id not in self._types:
+            return
+
+        status = status_for_decision(decision)
+        previous = self._status[mission_id]
+        if status != previous:
+            self._decrement(self.missions_by_status, previous)
+            self.missions_by_status[status] += 1
+            self._status[mission_id] = status
+            self._dirty_status[mission_id] = status
+
+        mode = decision.autonomy_mode
+        previous_mode = self._mode.get(mission_id)
+        if mode != previous_mode:
+            if previous_mode:
+                self._decrement(self.autonomy_modes, previous_mode)
+            self.autonomy_modes[mode] += 1
+            self._mode[mission_id] = mode
+
+        self._confidence_sum += decision.confidence - self._confidence.get(mission_id, 0.0)
+        self._confidence[mission_id] = decision.confidence
+        self._ticks += 1
+        self._ticks_confidence_sum += decision.confidence
+
+        if decision.anomaly_detected:
+            self.anomalies.add(decision.anomaly_type, now=now)
+
+    def pop_dirty_statuses(self) -> Dict[int, str]:
+        dirty, self._dirty_status = self._dirty_status, {}
+        return dirty
+
+    def requeue_statuses(self, statuses: Dict[int, str]):
+        # Failed write-back: keep anything newer that was queued in the meantime
+        for mission_id, status in statuses.items():
+            self._dirty_status.setdefault(mission_id, status)
+
+    def summary(self) -> dict:
+        active = len(self._types)
+        return {
+            "active_missions": active,
+            "missions_by_status": dict(self.missions_by_status),
+            "missions_by_type": dict(self.missions_by_type),
+            "autonomy_modes": dict(self.autonomy_modes),
+            "anomalies": self.anomalies.totals(),
+            "confidence": {
+                "current_mean": round(self._confidence_sum / len(self._confidence), 4) if self._confidence else None,
+                "lifetime_mean": round(self._ticks_confidence_sum / self._ticks, 4) if self._ticks else None,
+            },
+            "ticks_processed": self._ticks,
+            "pending_status_writes": len(self._dirty_status),
+        }
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
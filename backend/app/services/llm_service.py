@@ -0,0 +1,321 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import httpx
+from pydantic import ValidationError
+from .. import schemas
+from ..prompts import SYSTEM_PROMPT
+
+logger = logging.getLogger(__name__)
+
+BATCH_INSTRUCTIONS = """
+========================
+BATCH MODE
+========================
+The user message is a JSON object {"samples": [{"id": ..., "telemetry": {...}}, ...]}.
+Reply with a single JSON object {"results": [...]} holding one OUTPUT CONTRACT object per sample,
+in any order, each with an extra "id" field copied from its sample.
+"""
+
+# Quantization steps for the cache signature; telemetry within a step shares a model answer
+SIGNATURE_STEPS = {
+    "battery_level": 2.0,
+    "thermal_state": 2.0,
+    "orientation_roll": 1.0,
+    "orientation_pitch": 5.0,
+    "orientation_yaw": 5.0,
+    "signal_latency": 25.0,
+}
+
+
+def telemetry_signature(telemetry: schemas.TelemetryCreate) -> Tuple:
+    return tuple(
+        round(getattr(telemetry, field) / step) for field, step in SIGNATURE_STEPS.items()
+    ) + (telemetry.is_stable,)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return len(text) // 4 + 1
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire after `ttl` seconds.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TokenBudget:
+    """
+    Rolling one-minute token allowance shared by every model call.
+    """
+    def __init__(self, tokens_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self._spent = deque()  # (timestamp, tokens)
+        self._total = 0
+
+    def _expire(self, now: float):
+        while self._spent and self._spent[0][0] <= now - 60:
+            self._total -= self._spent.popleft()[1]
+
+    def try_reserve(self, tokens: int) -> bool:
+        now = time.monotonic()
+        self._expire(now)
+        if self._total + tokens > self.tokens_per_minute:
+            return False
+        self._spent.append((now, tokens))
+        self._total += tokens
+        return True
+
+    def adjust(self, reserved: int, actual: int):
+        # Reconcile the estimate with the usage the endpoint reported
+        if actual != reserved:
+            self._spent.append((time.monotonic(), actual - reserved))
+            self._total += actual - reserved
+
+    @property
+    def remaining(self) -> int:
+        self._expire(time.monotonic())
+        return max(0, self.tokens_per_minute - self._total)
+
+
+class ModelAnalyzer:
+    """
+    Model-backed telemetry analysis over an OpenAI-compatible chat completions endpoint.
+    Requests from many missions are micro-batched into one call, bounded by a global
+    concurrency limit and token budget, and cached by quantized telemetry signature.
+    `analyze` never waits past its deadline: it returns None and the caller falls back to rules.
+    """
+    def __init__(
+        self,
+        url: str,
+        api_key: Optional[str] = None,
+        model: str = "gemini-1.5-flash",
+        deadline: float = 0.8,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 60000,
+        max_output_tokens: int = 4096,
+        batch_size: int = 16,
+        batch_window: float = 0.025,
+        cache_size: int = 4096,
+        cache_ttl: float = 60.0,
+        request_timeout: float = 10.0,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.deadline = deadline
+        self.max_output_tokens = max_output_tokens
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.request_timeout = request_timeout
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.budget = TokenBudget(tokens_per_minute)
+        self.stats = {"requests": 0, "cache_hits": 0, "batches": 0, "timeouts": 0, "errors": 0, "shed": 0}
+
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[Tuple, asyncio.Future] = {}  # signature -> in-flight result
+        self._dispatches = set()
+
+    @classmethod
+    def from_env(cls) -> Optional["ModelAnalyzer"]:
+        url = os.getenv("ORBITA_LLM_URL")
+        if not url:
+            return None
+        return cls(
+            url=url,
+            api_key=os.getenv("GEMINI_API_KEY"),
+            model=os.getenv("ORBITA_LLM_MODEL", "gemini-1.5-flash"),
+            deadline=float(os.getenv("ORBITA_LLM_DEADLINE_MS", "800")) / 1000,
+            max_concurrency=int(os.getenv("ORBITA_LLM_MAX_CONCURRENCY", "4")),
+            tokens_per_minute=int(os.getenv("ORBITA_LLM_TOKENS_PER_MINUTE", "60000")),
+            batch_size=int(os.getenv("ORBITA_LLM_BATCH_SIZE", "16")),
+            batch_window=float(os.getenv("ORBITA_LLM_BATCH_WINDOW_MS", "25")) / 1000,
+            cache_size=int(os.getenv("ORBITA_LLM_CACHE_SIZE", "4096")),
+            cache_ttl=float(os.getenv("ORBITA_LLM_CACHE_TTL", "60")),
+        )
+
+    async def analyze(self, telemetry: schemas.TelemetryCreate) -> Optional[schemas.AIResponse]:
+        self.stats["requests"] += 1
+        signature = telemetry_signature(telemetry)
+        cached = self.cache.get(signature)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._pending.get(signature)
+        if future is None:
+            # Identical in-flight signatures share one slot in the batch
+            future = asyncio.get_running_loop().create_future()
+            self._pending[signature] = future
+            self._ensure_worker()
+            self._queue.put_nowait((signature, telemetry, future))
+
+        try:
+            # shield: a late answer still lands in the cache for the next tick
+            return await asyncio.wait_for(asyncio.shield(future), self.deadline)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return None
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            window_ends = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = window_ends - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            if self._semaphore.locked():
+                # Every call slot is busy: shed instead of queueing behind slow responses
+                self.stats["shed"] += len(batch)
+                self._resolve(batch, {})
+                continue
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple]):
+        results = {}
+        async with self._semaphore:
+            samples = [{"id": i, "telemetry": telemetry.model_dump()} for i, (_, telemetry, _) in enumerate(batch)]
+            user_content = json.dumps({"samples": samples})
+            reserved = estimate_tokens(SYSTEM_PROMPT + BATCH_INSTRUCTIONS + user_content) + self.max_output_tokens
+            if not self.budget.try_reserve(reserved):
+                self.stats["shed"] += len(batch)
+                self._resolve(batch, results)
+                return
+
+            self.stats["batches"] += 1
+            try:
+                body = await self._post(user_content)
+                usage = body.get("usage") or {}
+                if "total_tokens" in usage:
+                    self.budget.adjust(reserved, int(usage["total_tokens"]))
+                results = self._parse(body)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Model analysis batch of {len(batch)} failed: {e}")
+        self._resolve(batch, results)
+
+    async def _post(self, user_content: str) -> dict:
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                timeout=self.request_timeout,
+                headers=headers,
+                limits=httpx.Limits(max_connections=self._max_concurrency),
+            )
+        response = await self._client.post(self.url, json={
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT + BATCH_INSTRUCTIONS},
+                {"role": "user", "content": user_content},
+            ],
+            "response_format": {"type": "json_object"},
+            "max_tokens": self.max_output_tokens,
+        })
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _parse(body: dict) -> Dict[int, schemas.AIResponse]:
+        content = body["choices"][0]["message"]["content"]
+        results = {}
+        for item in json.loads(content).get("results", []):
+            try:
+                results[int(item["id"])] = schemas.AIResponse.model_validate(item)
+            except (KeyError, TypeError, ValueError, ValidationError) as e:
+                logger.warning(f"Discarding malformed model result: {e}")
+        return results
+
+    def _resolve(self, batch: List[Tuple], results: Dict[int, schemas.AIResponse]):
+        for i, (signature, _, future) in enumerate(batch):
+            result = results.get(i)
+            if result is not None:
+                self.cache.set(signature, result)
+            self._pending.pop(signature, None)
+            if not future.done():
+                future.set_result(result)
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "cache_entries": len(self.cache),
+            "tokens_remaining": self.budget.remaining,
+            "in_flight": len(self._pending),
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        for task in list(self._dispatches):
+            task.cancel()
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_model_analyzer = None
+_model_analyzer_loaded = False
+
+
+def get_model_analyzer() -> Optional[ModelAnalyzer]:
+    """
+    Process-wide analyzer (shared cache, budget and batching), or None when no endpoint is configured.
+    """
+    global _model_analyzer, _model_analyzer_loaded
+    if not _model_analyzer_loaded:
+        _model_analyzer = ModelAnalyzer.from_env()
+        _model_analyzer_loaded = True
+    return _model_analyzer
+
+
+async def close_model_analyzer():
+    if _model_analyzer is not None:
+        await _model_analyzer.close()
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, insert, bindparam
+from typing import Dict, List, Tuple
 from .. import models, schemas
 
 class MissionService:
@@ -18,6 +19,33 @@ class MissionService:
         await self.db.refresh(db_mission)
         return db_mission
 
+    async def create_missions_bulk(self, missions: List[schemas.MissionCreate]):
+        """
+        Inserts many missions with one multi-row INSERT ... RETURNING and a single commit.
+        Rows come back in input order.
+        """
+        if not missions:
+            return []
+        result = await self.db.execute(
+            insert(models.Mission).returning(
+                models.Mission.id,
+                models.Mission.satellite_type,
+                models.Mission.altitude,
+                models.Mission.inclination,
+                sort_by_parameter_order=True,
+            ),
+            [mission.model_dump() for mission in missions],
+        )
+        rows = result.all()
+        await self.db.commit()
+        return rows
+
+    async def get_missions(self, mission_ids: List[int]):
+        if not mission_ids:
+            return []
+        result = await self.db.execute(select(models.Mission).where(models.Mission.id.in_(mission_ids)))
+        return result.scalars().all()
+
     async def get_mission(self, mission_id: int):
         result = await self.db.execute(select(models.Mission).filter(models.Mission.id == mission_id))
         return result.scalars().first()
@@ -26,6 +54,35 @@ class MissionService:
         result = await self.db.execute(select(models.Mission).where(models.Mission.is_active == True))
         return result.scalars().all()
     
+    async def update_statuses(self, statuses: Dict[int, str]):
+        """
+        Writes many mission status changes in a single executemany + commit.
+        """
+        if not statuses:
+            return
+        # Core executemany: rows deleted meanwhile are skipped instead of failing the whole batch
+        table = models.Mission.__table__
+        stmt = update(table).where(table.c.id == bindparam("mission_id")).values(status=bindparam("new_status"))
+        await self.db.execute(
+            stmt,
+            [{"mission_id": mission_id, "new_status": status} for mission_id, status in statuses.items()],
+        )
+        await self.db.commit()
+
+    async def update_episodes(self, episodes: Dict[int, dict]):
+        """
+        Stores many episode summaries (decision_id -> episode dict) in a single executemany + commit.
+        """
+        if not episodes:
+            return
+        table = models.DecisionLog.__table__
+        stmt = update(table).where(table.c.id == bindparam("decision_id")).values(episode=bindparam("summary"))
+        await self.db.execute(
+            stmt,
+            [{"decision_id": decision_id, "summary": episode} for decision_id, episode in episodes.items()],
+        )
+        await self.db.commit()
+    
     async def log_telemetry(self, mission_id: int, data: schemas.TelemetryCreate):
         db_log = models.TelemetryLog(
             mission_id=mission_id,
@@ -42,11 +99,27 @@ class MissionService:
         await self.db.refresh(db_log)
         return db_log
 
-    async def log_decision(self, mission_id: int, decision: schemas.AIResponse):
+    async def log_decision(self, mission_id: int, decision: schemas.AIResponse, episode: dict = None):
+        db_decision = self._decision_row(mission_id, decision, episode)
+        self.db.add(db_decision)
+        await self.db.commit()
+        return db_decision
+
+    async def log_decisions(self, decisions: List[Tuple[int, schemas.AIResponse]]):
+        """
+        Inserts many (mission_id, decision) rows in a single commit.
+        """
+        if not decisions:
+            return
+        self.db.add_all([self._decision_row(mission_id, decision) for mission_id, decision in decisions])
+        await self.db.commit()
+
+    @staticmethod
+    def _decision_row(mission_id: int, decision: schemas.AIResponse, episode: dict = None) -> models.DecisionLog:
         # Convert Pydantic list of objects to list of dicts for JSON storage
-        recovery_dicts = [action.model_dump() for action in decision.recovery_actions_considered]
+        recovery_dicts = [{"action": action} for action in decision.coordination_recommendations]
         
-        db_decision = models.DecisionLog(
+        return models.DecisionLog(
             mission_id=mission_id,
             anomaly_detected=decision.anomaly_type,
             action_taken=decision.selected_action,
@@ -54,8 +127,35 @@ class MissionService:
             confidence_score=decision.confidence,
             root_cause=decision.root_cause_hypothesis,
             recovery_options=recovery_dicts, # SQLAlchemy JSON field handles dicts/lists
+            episode=episode,
             outcome_verified=None 
         )
-        self.db.add(db_decision)
+
+    async def update_decision(
+        self,
+        decision_id: int,
+        decision: schemas.AIResponse = None,
+        outcome_verified: bool = None,
+        episode: dict = None,
+    ):
+        """
+        Updates an episode's DecisionLog row in place instead of inserting a new one.
+        """
+        values = {}
+        if decision is not None:
+            values.update(
+                action_taken=decision.selected_action,
+                reasoning=decision.explanation,
+                confidence_score=decision.confidence,
+                root_cause=decision.root_cause_hypothesis,
+            )
+        if outcome_verified is not None:
+            values["outcome_verified"] = outcome_verified
+        if episode is not None:
+            values["episode"] = episode
+        if not values:
+            return
+        await self.db.execute(
+            update(models.DecisionLog).where(models.DecisionLog.id == decision_id).values(**values)
+        )
         await self.db.commit()
-        return db_decision
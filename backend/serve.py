@@ -0,0 +1,85 @@
+"""
+Production entrypoint: multiple workers, no reloader, uvloop/httptools when installed.
+
+    python serve.py --workers 4
+
+Every worker runs its own autonomy engine. Mission start/stop, in-memory views
+(/fleet/*, latest telemetry, WebSocket feeds), conjunction screening and status
+write-back are all per worker, so run a single worker unless a load balancer
+pins each mission's requests to one worker.
+"""
+import argparse
+import copy
+import importlib.util
+import logging
+import logging.config
+import os
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+logger = logging.getLogger("app.serve")
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _log_config(level: str) -> dict:
+    # Route the app's own loggers through uvicorn's handlers in every worker
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["app"] = {"handlers": ["default"], "level": level.upper(), "propagate": False}
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ORBITA API in production mode")
+    parser.add_argument("--host", default=os.getenv("ORBITA_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("ORBITA_PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ORBITA_WORKERS", "1")))
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=float(os.getenv("ORBITA_GRACEFUL_TIMEOUT", "15")),
+        help="Seconds to wait for open connections before lifespan shutdown (mission drain follows)",
+    )
+    parser.add_argument("--log-level", default=os.getenv("ORBITA_LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action="store_true", help="Enable per-request access logging")
+    args = parser.parse_args()
+
+    # Same config the workers get, so these messages go through uvicorn's handlers too
+    log_config = _log_config(args.log_level)
+    logging.config.dictConfig(log_config)
+
+    if args.workers > 1:
+        logger.warning(
+            f"Running {args.workers} workers: each has its own autonomy engine. A stop request that "
+            "reaches a different worker than the one running the mission returns stopped: 0 and the "
+            "loop keeps running; fleet views, WebSocket feeds, conjunction screening and status "
+            "write-back only cover each worker's own missions. Use --workers 1 unless requests are "
+            "pinned per mission."
+        )
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+
+    # The app is imported by each worker, not here; every worker logs its own
+    # import and startup cost once ready and reports them on GET /health
+    logger.info(f"ORBITA serving on {args.host}:{args.port} with {args.workers} worker(s), loop={loop}, http={http}")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        reload=False,
+        access_log=args.access_log,
+        log_level=args.log_level,
+        log_config=log_config,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()